@@ -0,0 +1,295 @@
+import argparse
+import builtins
+import contextlib
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+import Employee_db
+import Expense_Journal
+from Expense_Records import ExpenseTable
+import Expense_Tracker
+import Log_Writer
+import Report_card
+import Smart_Expense_Tracker
+
+# Reproducible benchmarks for the tracker hot paths.
+#
+#   python Benchmark.py --sizes 1000,100000 --output bench.json
+#   python Benchmark.py --sizes 1000,100000 --baseline bench.json --threshold 0.2
+#
+# With --baseline, every benchmark is compared against the saved result
+# and the run exits with status 1 if any is slower by more than threshold.
+
+SEED = 20251106
+DEFAULT_SIZES = (1000, 10000, 100000)
+CATEGORIES = ("Food", "Travel", "Shopping", "Bills", "Entertainment", "Rent", "Health", "Misc")
+DEPARTMENTS = ("HR", "IT", "Finance", "Sales", "Operations")
+SUBJECTS = ("Math", "Science", "English", "History", "Geography")
+START_DATE = date(2023, 1, 1)
+
+
+# --- Synthetic data ---
+
+def make_expenses(n, seed=SEED):
+    rng = random.Random(seed)
+    return [
+        {
+            "date": (START_DATE + timedelta(days=rng.randrange(1095))).isoformat(),
+            "category": rng.choice(CATEGORIES),
+            "amount": round(rng.uniform(10, 5000), 2),
+            "description": f"item {rng.randrange(1000)}",
+        }
+        for _ in range(n)
+    ]
+
+
+def make_expense_rows(n, seed=SEED):
+    return [(e["date"], e["category"], e["amount"]) for e in make_expenses(n, seed)]
+
+
+def make_employees(n, seed=SEED):
+    rng = random.Random(seed)
+    return [(i, f"Employee {i}", rng.choice(DEPARTMENTS), rng.randrange(20000, 200000))
+            for i in range(1, n + 1)]
+
+
+def make_students(n_marks, seed=SEED):
+    rng = random.Random(seed)
+    students = {}
+    n_students = max(1, n_marks // len(SUBJECTS))
+    for i in range(n_marks):
+        student_id = 1000 + i % n_students
+        entry = students.setdefault(student_id, {"name": f"Student {student_id}", "subjects": {}})
+        entry["subjects"][SUBJECTS[(i // n_students) % len(SUBJECTS)]] = rng.randrange(20, 101)
+    return students
+
+
+# --- Timing ---
+
+def measure(func, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "mean": sum(times) / len(times), "repeat": repeat}
+
+
+def allocated(build):
+    # Bytes still held by whatever build() returns.
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+        del kept
+        return size
+    finally:
+        tracemalloc.stop()
+
+
+@contextlib.contextmanager
+def quiet():
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+@contextlib.contextmanager
+def answers(*replies):
+    # Feeds fixed answers to the interactive prompts.
+    original = builtins.input
+    replies = list(replies)
+    builtins.input = lambda prompt="": replies.pop(0) if replies else ""
+    try:
+        yield
+    finally:
+        builtins.input = original
+
+
+def bench_expense_store(size, repeat, results):
+    expenses = make_expenses(size)
+    ledger = Smart_Expense_Tracker.EXPENSES_FILE
+    Expense_Journal.write_snapshot(ledger, expenses)
+    Smart_Expense_Tracker.load_expenses()  # save_expenses() expects the version it loaded
+
+    results[f"save_expenses@{size}"] = measure(
+        lambda: Smart_Expense_Tracker.save_expenses(expenses), repeat)
+    results[f"load_expenses@{size}"] = measure(
+        Smart_Expense_Tracker.load_expenses, repeat, setup=Expense_Journal.clear_cache)
+    results[f"load_expenses_cached@{size}"] = measure(
+        Smart_Expense_Tracker.load_expenses, repeat)
+
+    def add_one():
+        with answers("2024-06-15", "Food", "125.50", "bench"):
+            Smart_Expense_Tracker.add_expense()
+    results[f"add_expense@{size}"] = measure(add_one, repeat)
+
+    results[f"view_expenses@{size}"] = measure(Smart_Expense_Tracker.view_expenses, repeat)
+
+    def monthly():
+        with answers("06 2024"):
+            Smart_Expense_Tracker.generate_monthly_summary()
+    results[f"generate_monthly_summary@{size}"] = measure(monthly, repeat)
+
+
+def bench_calculate_summary(size, repeat, results):
+    rows = make_expense_rows(size)
+    results[f"calculate_summary@{size}"] = measure(
+        lambda: Expense_Tracker.calculate_summary(rows), repeat)
+
+
+def bench_record_layout(size, repeat, results):
+    # The same serialized ledger decoded into a list of dicts and into an
+    # ExpenseTable.
+    text = json.dumps(make_expenses(size))
+    rows = make_expense_rows(size)
+    table = ExpenseTable.from_json(text)
+
+    results[f"layout_dict_build@{size}"] = measure(lambda: json.loads(text), repeat)
+    results[f"layout_dict_build@{size}"]["bytes"] = allocated(lambda: json.loads(text))
+    results[f"layout_table_build@{size}"] = measure(lambda: ExpenseTable.from_json(text), repeat)
+    results[f"layout_table_build@{size}"]["bytes"] = allocated(lambda: ExpenseTable.from_json(text))
+
+    results[f"layout_rows_summary@{size}"] = measure(
+        lambda: Expense_Tracker.calculate_summary(rows), repeat)
+    results[f"layout_table_summary@{size}"] = measure(
+        lambda: Expense_Tracker.calculate_summary(table), repeat)
+
+
+def bench_report_card(size, repeat, results):
+    students = make_students(size)
+    results[f"generate_report@{size}"] = measure(
+        lambda: Report_card.generate_report(students), repeat)
+    report_data = Report_card.generate_report(students)
+    results[f"write_report@{size}"] = measure(
+        lambda: Report_card.write_summary(report_data, "report.txt"), repeat)
+
+
+def bench_employee_db(size, repeat, results):
+    employees = make_employees(size)
+    rng = random.Random(SEED)
+    lookups = [rng.randrange(1, size + 1) for _ in range(min(size, 10000))]
+    db_files = []
+
+    def fresh_db():
+        Employee_db.clear_caches()
+        db_name = f"bench_{len(db_files)}.db"
+        db_files.append(db_name)
+        con = Employee_db.create_connection(db_name)
+        Employee_db.create_table(con)
+        return con
+
+    state = {}
+
+    def setup_insert():
+        state["con"] = fresh_db()
+    results[f"employee_insert_many@{size}"] = measure(
+        lambda: Employee_db.insert_many(state["con"], employees), repeat, setup=setup_insert)
+
+    con = state["con"]
+    results[f"employee_get_employee@{size}"] = measure(
+        lambda: [Employee_db.get_employee(con, i) for i in lookups], repeat,
+        setup=Employee_db.clear_caches)
+    results[f"employee_iter_employees@{size}"] = measure(
+        lambda: sum(1 for _ in Employee_db.iter_employees(con)), repeat)
+    raises = [(e[0], None, None, e[3] + 1000) for e in employees]
+    results[f"employee_update_many@{size}"] = measure(
+        lambda: Employee_db.update_many(con, raises), repeat)
+
+    def setup_delete():
+        state["con"] = fresh_db()
+        Employee_db.insert_many(state["con"], employees)
+    results[f"employee_delete_many@{size}"] = measure(
+        lambda: Employee_db.delete_many(state["con"], range(1, size + 1)), repeat, setup=setup_delete)
+
+
+BENCHMARKS = (bench_expense_store, bench_calculate_summary, bench_record_layout,
+              bench_report_card, bench_employee_db)
+
+
+def run(sizes, repeat):
+    results = {}
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="tracker-bench-") as workdir:
+        os.chdir(workdir)
+        try:
+            for size in sizes:
+                for bench in BENCHMARKS:
+                    print(f"Running {bench.__name__} at {size} rows...", file=sys.stderr)
+                    with quiet():
+                        bench(size, repeat, results)
+        finally:
+            Log_Writer.flush_all()
+            os.chdir(original_dir)
+    return {
+        "meta": {
+            "seed": SEED,
+            "sizes": list(sizes),
+            "repeat": repeat,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold):
+    # Returns the names of benchmarks slower than baseline by more than threshold.
+    regressions = []
+    for name, result in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<45} {result['best']:.6f}s  (new)")
+            continue
+        change = result["best"] / base["best"] - 1 if base["best"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<45} {result['best']:.6f}s  vs {base['best']:.6f}s  ({change:+.1%}){flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the expense and employee trackers.")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="comma-separated row counts, e.g. 1000,100000,10000000")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown before failing, as a fraction (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    current = run(sizes, args.repeat)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}.")
+            return 1
+    else:
+        for name, result in sorted(current["results"].items()):
+            size = f"  {result['bytes'] / 1e6:.1f} MB" if "bytes" in result else ""
+            print(f"{name:<45} {result['best']:.6f}s{size}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
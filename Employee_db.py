@@ -1,5 +1,23 @@
+import queue
 import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import islice
+
+from Log_Writer import log_line
+from Profiler import profile_session
+
+LOG_FILE = "logs.txt"
+BATCH_SIZE = 1000
+PAGE_SIZE = 1000
+
+# sqlite3 keeps compiled statements per connection; the read APIs below use
+# fixed SQL strings so repeated calls reuse them.
+SELECT_ONE = "SELECT * FROM Employees WHERE Emp_ID = ?"
+SELECT_ALL = "SELECT * FROM Employees"
 
 # Decorator for Logging Operations
 def logging_info(func):
@@ -9,17 +27,30 @@ def logging_info(func):
 
         log_entry = f"[{now}] Function {func.__name__} is Executed.\n"
         print(log_entry)
-        with open("logs.txt", 'a') as file:
-            file.write(log_entry)
+        log_line(LOG_FILE, log_entry)
         return result
     return wrapper
 
 
+def log_batch(operation, batch_no, rows, failed):
+    # Batch operations log one line per batch instead of one per row.
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    log_entry = (f"[{now}] Function {operation} is Executed. "
+                 f"Batch {batch_no}: {rows - failed} of {rows} rows succeeded.\n")
+    log_line(LOG_FILE, log_entry)
+
+
+class EmployeeConnection(sqlite3.Connection):
+    # sqlite3.Connection that can carry its employee_cache, so cache_for()
+    # does not have to look the database up on every call.
+    employee_cache = None
+
+
 @logging_info
 def create_connection(db_name):
     con = None
     try:
-        con = sqlite3.connect(db_name)
+        con = sqlite3.connect(db_name, factory=EmployeeConnection)
         print(f"Connection Created Successfully for : {db_name}")
     except sqlite3.Error as e:
         print(f"Error occurred in Creating Connection: {e}")
@@ -27,6 +58,241 @@ def create_connection(db_name):
 # Returns the Connection Object
 
 
+class ConnectionPool:
+    # A fixed set of connections shared between threads. A thread that already
+    # holds a connection gets the same one back on nested checkouts; writers
+    # additionally take a pool-wide lock so writes are serialized.
+    def __init__(self, db_name, size=4, synchronous="NORMAL", cache_size=-16000, busy_timeout=5000):
+        self.db_name = db_name
+        self.size = size
+        self._idle = queue.Queue(maxsize=size)
+        self._local = threading.local()
+        self._write_lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        for _ in range(size):
+            con = sqlite3.connect(db_name, check_same_thread=False, timeout=busy_timeout / 1000,
+                                  factory=EmployeeConnection)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute(f"PRAGMA synchronous={synchronous}")
+            con.execute(f"PRAGMA cache_size={int(cache_size)}")
+            con.execute(f"PRAGMA busy_timeout={int(busy_timeout)}")
+            self._idle.put(con)
+        print(f"Connection Pool of {size} Created Successfully for : {db_name}")
+
+    @contextmanager
+    def connection(self, timeout=None):
+        local = self._local
+        con = getattr(local, "con", None)
+        if con is not None:
+            local.depth += 1
+            try:
+                yield con
+            finally:
+                local.depth -= 1
+            return
+
+        start = time.perf_counter()
+        try:
+            con = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No connection available in pool for {self.db_name}")
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+        local.con = con
+        local.depth = 1
+        try:
+            yield con
+        finally:
+            local.depth -= 1
+            if local.depth == 0:
+                local.con = None
+                if con.in_transaction:
+                    con.rollback()
+                self._idle.put(con)
+
+    @contextmanager
+    def writer(self, timeout=None):
+        # Connection first, then the write lock: the same order as a writer()
+        # nested inside connection(), so the two can never deadlock.
+        with self.connection(timeout) as con:
+            with self._write_lock:
+                yield con
+
+    def stats(self):
+        with self._stats_lock:
+            checkouts = self._checkouts
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "checkouts": checkouts,
+                "total_wait": self._total_wait,
+                "avg_wait": self._total_wait / checkouts if checkouts else 0.0,
+                "max_wait": self._max_wait,
+            }
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class EmployeeCache:
+    # LRU cache of Emp_ID -> row (or None for "no such employee"), with a
+    # maximum size and a time-to-live, for one database; see cache_for().
+    #
+    # generation goes up on every invalidation. A reader takes it before its
+    # query and passes it to put(), which then refuses to store a row that a
+    # write may have made stale while the query was running.
+    def __init__(self, max_size=1024, ttl=60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self._rows = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def get(self, Emp_ID):
+        # Returns (found, row)
+        with self._lock:
+            entry = self._rows.get(Emp_ID)
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            expires, row = entry
+            if expires < time.monotonic():
+                del self._rows[Emp_ID]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return False, None
+            self._rows.move_to_end(Emp_ID)
+            self._stats["hits"] += 1
+            return True, row
+
+    def put(self, Emp_ID, row, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._rows[Emp_ID] = (time.monotonic() + self.ttl, row)
+            self._rows.move_to_end(Emp_ID)
+            while len(self._rows) > self.max_size:
+                self._rows.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, Emp_ID):
+        with self._lock:
+            self.generation += 1
+            if self._rows.pop(Emp_ID, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._rows.clear()
+
+    def stats(self):
+        with self._lock:
+            info = dict(self._stats)
+            info["size"] = len(self._rows)
+            lookups = info["hits"] + info["misses"]
+            info["hit_rate"] = info["hits"] / lookups if lookups else 0.0
+            return info
+
+
+# One cache per database file, shared by every connection to it.
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def cache_for(con):
+    # Returns the EmployeeCache for the database con is connected to, or
+    # None for a plain sqlite3 connection to an in-memory database.
+    cache = getattr(con, "employee_cache", None)
+    if cache is not None:
+        return cache
+    path = con.execute("PRAGMA database_list").fetchone()[2]
+    if path:
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                cache = _caches[path] = EmployeeCache()
+    elif isinstance(con, EmployeeConnection):
+        cache = EmployeeCache()  # in-memory database, private to con
+    else:
+        return None
+    if isinstance(con, EmployeeConnection):
+        con.employee_cache = cache
+    return cache
+
+
+def clear_caches():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.clear()
+
+
+def _invalidate(con, Emp_ID):
+    cache = cache_for(con)
+    if cache is not None:
+        cache.invalidate(Emp_ID)
+
+
+def get_employee(con, Emp_ID, use_cache=True):
+    # Returns the row tuple for Emp_ID, or None if there is no such employee.
+    cache = cache_for(con) if use_cache else None
+    if cache is None:
+        return con.execute(SELECT_ONE, (Emp_ID,)).fetchone()
+    found, row = cache.get(Emp_ID)
+    if found:
+        return row
+    generation = cache.generation
+    row = con.execute(SELECT_ONE, (Emp_ID,)).fetchone()
+    cache.put(Emp_ID, row, generation)
+    return row
+
+
+def get_all_employees(con):
+    return con.execute(SELECT_ALL).fetchall()
+
+
+def iter_employees(con, page_size=PAGE_SIZE, Department=None, min_salary=None, max_salary=None):
+    # Yields rows in Emp_ID order, one page at a time. Each page resumes
+    # after the last Emp_ID seen (keyset pagination), so memory stays at one
+    # page and no page has to skip over the rows before it.
+    conditions = ["Emp_ID > ?"]
+    params = []
+    if Department is not None:
+        conditions.append("Department = ?")
+        params.append(Department)
+    if min_salary is not None:
+        conditions.append("Salary >= ?")
+        params.append(min_salary)
+    if max_salary is not None:
+        conditions.append("Salary <= ?")
+        params.append(max_salary)
+    sql = (f"SELECT * FROM Employees WHERE {' AND '.join(conditions)} "
+           f"ORDER BY Emp_ID LIMIT ?")
+
+    last_id = -(2 ** 63)
+    while True:
+        rows = con.execute(sql, (last_id, *params, page_size)).fetchall()
+        if not rows:
+            return
+        yield from rows
+        if len(rows) < page_size:
+            return
+        last_id = rows[-1][0]
+
+
 @logging_info
 def create_table(con):
     try:
@@ -39,6 +305,8 @@ def create_table(con):
                 Salary INTEGER NOT NULL
             )
         ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_department ON Employees(Department, Emp_ID)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_employees_salary ON Employees(Salary)")
         con.commit()
         print("Employee Table Created Successfully")
     except sqlite3.Error as e:
@@ -54,6 +322,7 @@ def insert_data(con, Emp_ID, Name, Department, Salary):
             (Emp_ID, Name, Department, Salary)
         )
         con.commit()
+        _invalidate(con, Emp_ID)
         print(f"Employee {Name}'s Details Added Successfully")
     except sqlite3.Error as e:
         print(f"Error occurred in adding Employee {Name}'s Data: {e}")
@@ -62,13 +331,11 @@ def insert_data(con, Emp_ID, Name, Department, Salary):
 @logging_info
 def fetch_full_data(con):
     try:
-        cursor = con.cursor()
-        cursor.execute("SELECT * FROM Employees")
-        rows = cursor.fetchall()
-        if rows:
-            for row in rows:
-                print(row)
-        else:
+        found = False
+        for row in iter_employees(con):
+            print(row)
+            found = True
+        if not found:
             print("No Data Found")
             return
         print("All Employee Data Fetched Successfully")
@@ -80,12 +347,9 @@ def fetch_full_data(con):
 @logging_info
 def fetch_specific_row(con, Emp_ID):
     try:
-        cursor = con.cursor()
-        cursor.execute("SELECT * FROM Employees WHERE Emp_ID = ?", (Emp_ID,))
-        rows = cursor.fetchall()
-        if rows:
-            for row in rows:
-                print(row)
+        row = get_employee(con, Emp_ID)
+        if row:
+            print(row)
         else:
             print("No Data Found for given Employee ID")
             return
@@ -109,6 +373,7 @@ def update_data(con, Emp_ID, Name=None, Department=None, Salary=None):
         ''', (Name, Department, Salary, Emp_ID))
         
         con.commit()
+        _invalidate(con, Emp_ID)
         if cursor.rowcount > 0:
             print(f"Employee with ID {Emp_ID} updated successfully.")
         else:
@@ -122,23 +387,139 @@ def delete_data(con, Emp_ID):
         cursor = con.cursor()
         cursor.execute("DELETE FROM Employees WHERE Emp_ID = ?", (Emp_ID,))
         con.commit()
+        _invalidate(con, Emp_ID)
         print(f"Employee with ID {Emp_ID}'s Data Deleted Successfully")
     except sqlite3.Error as e:
         print(f"Error occurred while performing Delete operation: {e}")
 
 
+def _batches(rows, batch_size):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def _run_batch(con, sql, batch):
+    # Tries the whole batch with one executemany. If any row fails, the batch
+    # is rolled back to its savepoint and replayed row by row so the good
+    # rows still go in and each bad row is reported.
+    cursor = con.cursor()
+    cursor.execute("SAVEPOINT employee_batch")
+    try:
+        cursor.executemany(sql, batch)
+        changed = cursor.rowcount
+        failures = []
+    except sqlite3.Error:
+        cursor.execute("ROLLBACK TO employee_batch")
+        changed = 0
+        failures = []
+        for row in batch:
+            try:
+                cursor.execute(sql, row)
+                changed += cursor.rowcount
+            except sqlite3.Error as e:
+                failures.append((row, str(e)))
+    cursor.execute("RELEASE employee_batch")
+    return changed, failures
+
+
+def _run_many(con, operation, sql, rows, batch_size, key_index):
+    # key_index is the position of Emp_ID in each parameter row, used to
+    # drop the touched rows from the database's EmployeeCache once the
+    # changes are committed.
+    #
+    # If the caller already has a transaction open, the batches run inside a
+    # savepoint in it and nothing is committed: committing or rolling back
+    # stays with the caller, who should also call cache_for(con).clear()
+    # after committing. On error only this call's changes are undone.
+    changed = 0
+    failures = []
+    touched = []
+    started = not con.in_transaction
+    try:
+        if started:
+            con.execute("BEGIN")
+        else:
+            con.execute("SAVEPOINT employee_many")
+        for batch_no, batch in enumerate(_batches(rows, batch_size), start=1):
+            batch_changed, batch_failures = _run_batch(con, sql, batch)
+            changed += batch_changed
+            failures.extend(batch_failures)
+            log_batch(operation, batch_no, len(batch), len(batch_failures))
+            touched.extend(row[key_index] for row in batch)
+        if started:
+            con.commit()
+        else:
+            con.execute("RELEASE employee_many")
+    except sqlite3.Error as e:
+        if started:
+            con.rollback()
+        else:
+            con.execute("ROLLBACK TO employee_many")
+            con.execute("RELEASE employee_many")
+        print(f"Error occurred in {operation}, all changes rolled back: {e}")
+        return {"changed": 0, "failed": failures}
+
+    for Emp_ID in touched:
+        _invalidate(con, Emp_ID)
+
+    print(f"{operation}: {changed} row(s) changed, {len(failures)} row(s) failed")
+    for row, error in failures:
+        print(f"  Failed {row}: {error}")
+    return {"changed": changed, "failed": failures}
+
+
+def insert_many(con, rows, batch_size=BATCH_SIZE):
+    # rows: iterable of (Emp_ID, Name, Department, Salary)
+    return _run_many(
+        con, "insert_many",
+        "INSERT INTO Employees (Emp_ID, Name, Department, Salary) VALUES (?, ?, ?, ?)",
+        rows, batch_size, 0
+    )
+
+
+def update_many(con, rows, batch_size=BATCH_SIZE):
+    # rows: iterable of (Emp_ID, Name, Department, Salary); None keeps the old value
+    return _run_many(
+        con, "update_many",
+        '''
+            UPDATE Employees
+            SET
+                Name = COALESCE(?, Name),
+                Department = COALESCE(?, Department),
+                Salary = COALESCE(?, Salary)
+            WHERE Emp_ID = ?
+        ''',
+        ((Name, Department, Salary, Emp_ID) for Emp_ID, Name, Department, Salary in rows),
+        batch_size, 3
+    )
+
+
+def delete_many(con, Emp_IDs, batch_size=BATCH_SIZE):
+    return _run_many(
+        con, "delete_many",
+        "DELETE FROM Employees WHERE Emp_ID = ?",
+        ((Emp_ID,) for Emp_ID in Emp_IDs),
+        batch_size, 0
+    )
+
+
 # --- Example usage ---
 if __name__ == "__main__":
-    connection = create_connection("company.db")
-    create_table(connection)
+    with profile_session("employee_db"):
+        connection = create_connection("company.db")
+        create_table(connection)
 
-    insert_data(connection, 101, "John Doe", "HR", 45000)
-    insert_data(connection, 102, "Jane Smith", "IT", 60000)
+        insert_data(connection, 101, "John Doe", "HR", 45000)
+        insert_data(connection, 102, "Jane Smith", "IT", 60000)
 
-    fetch_full_data(connection)
-    fetch_specific_row(connection, 102)
+        fetch_full_data(connection)
+        fetch_specific_row(connection, 102)
 
-    update_data(connection, 101, Salary=50000)
-    delete_data(connection, 102)
+        update_data(connection, 101, Salary=50000)
+        delete_data(connection, 102)
 
-    fetch_full_data(connection)
+        fetch_full_data(connection)
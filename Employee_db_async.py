@@ -0,0 +1,95 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import Employee_db
+
+# asyncio front-end for Employee_db. Every call runs on a dedicated thread
+# pool backed by an Employee_db.ConnectionPool, so the event loop never
+# blocks on sqlite3.
+#
+#   db = AsyncEmployeeDB("company.db")
+#   row = await db.get_employee(101)
+#   await db.close()
+
+
+class AsyncEmployeeDB:
+    def __init__(self, db_name, workers=4, max_pending=100):
+        self.pool = Employee_db.ConnectionPool(db_name, size=workers)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="employee-db")
+        # At most max_pending calls may be queued or running; further callers
+        # wait here, which pushes back on whoever is producing the requests.
+        self._slots = asyncio.Semaphore(max_pending)
+        self._inflight = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _call(self, func, args, kwargs, write):
+        checkout = self.pool.writer() if write else self.pool.connection()
+        with checkout as con:
+            return func(con, *args, **kwargs)
+
+    async def _run(self, func, *args, write=False, **kwargs):
+        # Cancelling the awaiting task drops a call that has not started yet.
+        # A call already running on a worker thread finishes, but its result
+        # is discarded.
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._call, func, args, kwargs, write)
+
+    async def _coalesced(self, key, func, *args, **kwargs):
+        # Concurrent identical reads share one query. shield() keeps one
+        # caller's cancellation from cancelling the query for the others.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._run(func, *args, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    # --- Reads ---
+
+    async def get_employee(self, Emp_ID):
+        return await self._coalesced(("get_employee", Emp_ID), Employee_db.get_employee, Emp_ID)
+
+    async def get_all_employees(self):
+        return await self._coalesced(("get_all_employees",), Employee_db.get_all_employees)
+
+    async def list_employees(self, Department=None, min_salary=None, max_salary=None):
+        def collect(con):
+            return list(Employee_db.iter_employees(
+                con, Department=Department, min_salary=min_salary, max_salary=max_salary))
+        key = ("list_employees", Department, min_salary, max_salary)
+        return await self._coalesced(key, collect)
+
+    # --- Writes ---
+
+    async def create_table(self):
+        return await self._run(Employee_db.create_table, write=True)
+
+    async def insert_data(self, Emp_ID, Name, Department, Salary):
+        return await self._run(Employee_db.insert_data, Emp_ID, Name, Department, Salary, write=True)
+
+    async def update_data(self, Emp_ID, Name=None, Department=None, Salary=None):
+        return await self._run(Employee_db.update_data, Emp_ID,
+                               Name=Name, Department=Department, Salary=Salary, write=True)
+
+    async def delete_data(self, Emp_ID):
+        return await self._run(Employee_db.delete_data, Emp_ID, write=True)
+
+    async def insert_many(self, rows, batch_size=Employee_db.BATCH_SIZE):
+        return await self._run(Employee_db.insert_many, list(rows), batch_size, write=True)
+
+    async def update_many(self, rows, batch_size=Employee_db.BATCH_SIZE):
+        return await self._run(Employee_db.update_many, list(rows), batch_size, write=True)
+
+    async def delete_many(self, Emp_IDs, batch_size=Employee_db.BATCH_SIZE):
+        return await self._run(Employee_db.delete_many, list(Emp_IDs), batch_size, write=True)
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._executor.shutdown, True)
+        self.pool.close()
@@ -0,0 +1,239 @@
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_left
+
+from Expense_Columns import np
+from Expense_Dates import date_key, month_bounds
+from Expense_Journal import load_records, write_snapshot
+from Expense_Records import Expense, StringTable, from_paise, paise_or_none
+from Expense_Tracker import iter_expense_chunks
+
+# Binary expense ledger that is read through mmap without parsing.
+#
+#   header    64 bytes, see HEADER
+#   records   count * 24 bytes, sorted by day, see RECORD
+#   strings   (n + 1) uint64 offsets into the blob that follows, then the
+#             UTF-8 blob; records refer to strings by index
+#
+# Opening a ledger reads only the header. Records and strings are decoded
+# on access, and a date range is found by binary search on the day field,
+# so a scan touches only the pages that hold that range. With NumPy,
+# ledger.array is a zero-copy structured view of all records. Drop any
+# view or array taken from a ledger before closing it.
+#
+#   python Expense_Binary.py import expenses.json expenses.ledger
+#   python Expense_Binary.py import Expense_Data.txt expenses.ledger
+#   python Expense_Binary.py export expenses.ledger expenses.json
+
+MAGIC = b"EXPLEDG1"
+VERSION = 1
+HEADER = struct.Struct("<8sHHIQQQQ16x")
+# day key (0 if the date is invalid), category, description and raw date
+# string indexes, amount in paise
+RECORD = struct.Struct("<iIIIq")
+INVALID_DAY = 0
+
+if np is not None:
+    RECORD_DTYPE = np.dtype([("day", "<i4"), ("category", "<u4"), ("description", "<u4"),
+                             ("date", "<u4"), ("paise", "<i8")])
+else:
+    RECORD_DTYPE = None
+
+
+def write_ledger(path, records):
+    # records: dicts as in expenses.json. Written to a temp file and renamed.
+    strings = StringTable()
+    packed = []
+    skipped = 0
+    for e in records:
+        paise = paise_or_none(e.get("amount", 0.0) or 0.0)
+        if paise is None:
+            skipped += 1
+            continue
+        date = str(e.get("date", ""))
+        packed.append((date_key(date) or INVALID_DAY,
+                       strings.code(str(e.get("category", "Misc"))),
+                       strings.code(str(e.get("description", ""))),
+                       strings.code(date),
+                       paise))
+    if skipped:
+        print(f"[Warning] Skipped {skipped} expense(s) with an invalid amount.")
+    packed.sort(key=lambda r: r[0])
+
+    records_offset = HEADER.size
+    body = bytearray(len(packed) * RECORD.size)
+    for i, r in enumerate(packed):
+        RECORD.pack_into(body, i * RECORD.size, *r)
+
+    blobs = [name.encode("utf-8") for name in strings.names]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    strings_offset = records_offset + len(body)
+
+    header = HEADER.pack(MAGIC, VERSION, 0, RECORD.size, len(packed),
+                         records_offset, strings_offset, len(blobs))
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(body)
+        f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+        f.write(b"".join(blobs))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    return len(packed)
+
+
+class BinaryLedger:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < HEADER.size:
+                raise ValueError(f"{path} is not an expense ledger")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, record_size, count, records_offset, strings_offset, strings_count = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self._mm.close()
+            raise ValueError(f"{path} is not a version {VERSION} expense ledger")
+        self.count = count
+        self._records_offset = records_offset
+        self._strings_offset = strings_offset
+        self._strings_count = strings_count
+        self._blob_offset = strings_offset + 8 * (strings_count + 1)
+        self._strings = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._mm.close()
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def view(self):
+        # memoryview over the packed records; no bytes are copied.
+        start = self._records_offset
+        return memoryview(self._mm)[start:start + self.count * RECORD.size]
+
+    @property
+    def array(self):
+        if np is None:
+            raise ImportError("numpy is required for BinaryLedger.array")
+        return np.frombuffer(self._mm, dtype=RECORD_DTYPE, count=self.count,
+                             offset=self._records_offset)
+
+    def string(self, i):
+        text = self._strings.get(i)
+        if text is None:
+            start, end = struct.unpack_from("<2Q", self._mm, self._strings_offset + 8 * i)
+            text = self._strings[i] = str(self._mm[self._blob_offset + start:self._blob_offset + end], "utf-8")
+        return text
+
+    def raw(self, i):
+        # (day, category, description, date, paise) with string indexes
+        return RECORD.unpack_from(self._mm, self._records_offset + i * RECORD.size)
+
+    def day(self, i):
+        return struct.unpack_from("<i", self._mm, self._records_offset + i * RECORD.size)[0]
+
+    def __getitem__(self, i):
+        if not 0 <= i < self.count:
+            raise IndexError(i)
+        day, category, description, date, paise = self.raw(i)
+        return Expense(self.string(date), day or None, self.string(category),
+                       paise, self.string(description))
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+    def records(self):
+        return [e.as_dict() for e in self]
+
+    def bounds(self, start_day, end_day):
+        # Index range of records with start_day <= day < end_day.
+        days = _DayKeys(self)
+        return bisect_left(days, start_day), bisect_left(days, end_day)
+
+    def scan(self, start_day, end_day):
+        lo, hi = self.bounds(start_day, end_day)
+        for i in range(lo, hi):
+            yield self[i]
+
+    def month(self, year, month):
+        return self.scan(*month_bounds(year, month))
+
+    def month_summary(self, year, month):
+        # Same shape as Expense_Rollup.month_summary: ({category: total}, total)
+        lo, hi = self.bounds(*month_bounds(year, month))
+        paise = {}
+        for i in range(lo, hi):
+            _, category, _, _, amount = self.raw(i)
+            paise[category] = paise.get(category, 0) + amount
+        totals = {self.string(c): from_paise(p) for c, p in paise.items()}
+        return totals, from_paise(sum(paise.values()))
+
+
+class _DayKeys:
+    # Sequence view of the day field, for bisect.
+    def __init__(self, ledger):
+        self.ledger = ledger
+
+    def __len__(self):
+        return self.ledger.count
+
+    def __getitem__(self, i):
+        return self.ledger.day(i)
+
+
+def read_text_records(filename):
+    for chunk in iter_expense_chunks(filename):
+        for date, category, amount in chunk:
+            yield {"date": date, "category": category, "amount": amount, "description": ""}
+
+
+def _amount_text(paise):
+    return str(paise // 100) if paise % 100 == 0 else f"{paise / 100:.2f}"
+
+
+def import_ledger(source, ledger_file="expenses.ledger"):
+    if source.endswith(".txt"):
+        records = list(read_text_records(source))
+    else:
+        records = load_records(source)
+    count = write_ledger(ledger_file, records)
+    print(f"Converted {count} expense(s) from {source} to {ledger_file}")
+    return count
+
+
+def export_ledger(ledger_file, target):
+    with BinaryLedger(ledger_file) as ledger:
+        if target.endswith(".txt"):
+            with open(target, "w", encoding="utf-8") as f:
+                for e in ledger:
+                    f.write(f"{e.date},{e.category},{_amount_text(e.paise)}\n")
+        else:
+            write_snapshot(target, ledger.records())
+        count = len(ledger)
+    print(f"Converted {count} expense(s) from {ledger_file} to {target}")
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2 and sys.argv[1] == "import":
+        import_ledger(*sys.argv[2:4])
+    elif len(sys.argv) > 3 and sys.argv[1] == "export":
+        export_ledger(*sys.argv[2:4])
+    else:
+        print("Usage: python Expense_Binary.py import <expenses.json|Expense_Data.txt> [expenses.ledger]\n"
+              "       python Expense_Binary.py export <expenses.ledger> <expenses.json|Expense_Data.txt>")
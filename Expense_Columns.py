@@ -0,0 +1,176 @@
+import math
+
+from Expense_Dates import date_key, month_bounds
+from Expense_Records import from_paise
+
+try:
+    import numpy as np
+except ImportError:  # the trackers fall back to their plain Python loops
+    np = None
+
+# Columnar view of the expense ledger for fast aggregation.
+#
+#   dates       int32   index into date_names
+#   days        int32   day key YYYYMMDD from Expense_Dates (INVALID_DAY if unparseable)
+#   codes       int32   index into categories
+#   paise       int64   amount in paise, as in ExpenseTable
+#   categories  list of category names, in order of first appearance
+#   date_names  list of date strings as given, in order of first appearance
+#
+# Building the columns is one pass over the records; every summary after
+# that is a NumPy reduction, and gives the same result as the plain
+# Python summary of the same rows.
+
+INVALID_DAY = -(2 ** 31)
+
+# Below this many rows the plain Python loops are just as fast.
+COLUMNAR_MIN_ROWS = 10000
+
+
+def available():
+    return np is not None
+
+
+def _amount(value):
+    # Amounts that are not numbers count as nan, so from_rows() skips them.
+    try:
+        return float(value or 0.0)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _sum_by(codes, paise, n):
+    # Per-code totals in paise. bincount adds in float64, which is exact
+    # for integers below 2**53 paise.
+    return np.rint(np.bincount(codes, weights=paise, minlength=n)).astype(np.int64)
+
+
+class ExpenseColumns:
+    def __init__(self, dates, codes, paise, categories, date_names):
+        self.dates = dates
+        self.codes = codes
+        self.paise = paise
+        self.categories = categories
+        self.date_names = date_names
+        self.skipped = 0  # rows from_rows() left out for a non-finite amount
+        # Parsed once per distinct date, with the same rules as the rest of the ledger.
+        day_of_date = np.array([date_key(d) or INVALID_DAY for d in date_names], dtype=np.int32)
+        self.days = day_of_date[dates]
+
+    def __len__(self):
+        return len(self.paise)
+
+    @classmethod
+    def from_rows(cls, rows):
+        # rows: iterable of (date, category, amount)
+        if np is None:
+            raise ImportError("numpy is required for ExpenseColumns")
+        category_index = {}
+        categories = []
+        date_index = {}
+        date_names = []
+        dates = []
+        codes = []
+        amounts = []
+        skipped = 0
+        for d, c, a in rows:
+            if not math.isfinite(a):
+                skipped += 1  # like SummaryAccumulator, leave out inf/nan amounts
+                continue
+            code = category_index.get(c)
+            if code is None:
+                code = category_index[c] = len(categories)
+                categories.append(c)
+            date_code = date_index.get(d)
+            if date_code is None:
+                date_code = date_index[d] = len(date_names)
+                date_names.append(d)
+            dates.append(date_code)
+            codes.append(code)
+            amounts.append(a)
+        # np.rint rounds half to even, like Expense_Records.to_paise().
+        paise = np.rint(np.array(amounts, dtype=np.float64) * 100).astype(np.int64)
+        columns = cls(
+            np.array(dates, dtype=np.int32),
+            np.array(codes, dtype=np.int32),
+            paise,
+            categories,
+            date_names,
+        )
+        columns.skipped = skipped
+        return columns
+
+    @classmethod
+    def from_records(cls, records):
+        # records: expense dicts as stored in expenses.json
+        return cls.from_rows(
+            (str(e.get("date", "")), e.get("category", "Misc"), _amount(e.get("amount", 0.0)))
+            for e in records
+        )
+
+    def total(self):
+        return from_paise(int(self.paise.sum()))
+
+    def category_totals(self, mask=None):
+        codes, paise = self.codes, self.paise
+        if mask is not None:
+            codes, paise = codes[mask], paise[mask]
+        sums = _sum_by(codes, paise, len(self.categories))
+        present = np.bincount(codes, minlength=len(self.categories)) > 0
+        return {self.categories[i]: from_paise(int(sums[i])) for i in np.flatnonzero(present)}
+
+    def month_mask(self, year, month):
+        start, end = month_bounds(year, month)
+        return (self.days >= start) & (self.days < end)
+
+    def month_summary(self, year, month):
+        mask = self.month_mask(year, month)
+        return self.category_totals(mask), from_paise(int(self.paise[mask].sum()))
+
+    def day_totals(self):
+        # Total paise for each entry of date_names. Dates are kept as given,
+        # so "2025/10/01" and "2025-10-01" are separate days, as in
+        # Expense_Tracker.SummaryAccumulator.
+        return _sum_by(self.dates, self.paise, len(self.date_names))
+
+    def highest_day(self):
+        sums = self.day_totals()
+        if len(sums) == 0:
+            return None, 0
+        # argmax picks the first date seen on a tie, like max() over a dict.
+        best = int(np.argmax(sums))
+        return self.date_names[best], from_paise(int(sums[best]))
+
+    def invalid_days(self):
+        return int((self.days == INVALID_DAY).sum())
+
+    def month_category_totals(self):
+        # {"YYYY-MM": {category: total}} for every month in the ledger.
+        return {month: {category: from_paise(p) for category, p in totals.items()}
+                for month, totals in self.month_category_paise().items()}
+
+    def month_category_paise(self):
+        # Same as month_category_totals(), in integer paise.
+        valid = self.days != INVALID_DAY
+        months = self.days[valid].astype(np.int64) // 100
+        ncat = len(self.categories)
+        keys = months * ncat + self.codes[valid]
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        sums = _sum_by(inverse.ravel(), self.paise[valid], len(uniq))
+        result = {}
+        for key, paise in zip(uniq.tolist(), sums.tolist()):
+            month_idx, code = divmod(key, ncat)
+            year, month = divmod(month_idx, 100)
+            label = f"{year:04d}-{month:02d}"
+            result.setdefault(label, {})[self.categories[code]] = paise
+        return result
+
+    def summary(self):
+        # Same shape as Expense_Tracker.calculate_summary()
+        highest_day, highest_day_amount = self.highest_day()
+        return {
+            "total_expense": self.total(),
+            "category_totals": self.category_totals(),
+            "highest_day": highest_day,
+            "highest_day_amount": highest_day_amount,
+        }
@@ -0,0 +1,88 @@
+import calendar
+from datetime import datetime
+from functools import lru_cache
+
+# Dates are normalized when a record is loaded, appended or saved into an
+# integer day key YYYYMMDD kept in the in-memory record as "day". It is
+# always derived from "date" and never written to disk. Keys sort and
+# compare like the dates themselves, so sorting and month filtering never
+# parse strings again. Records whose date cannot be parsed get day=None and
+# are reported as quarantined instead of being dropped.
+
+
+@lru_cache(maxsize=65536)
+def _parse_iso(text):
+    if len(text) != 10 or text[4] != "-" or text[7] != "-":
+        return None
+    y, m, d = text[:4], text[5:7], text[8:]
+    if not (y.isascii() and y.isdigit() and m.isascii() and m.isdigit()
+            and d.isascii() and d.isdigit()):
+        return None
+    year, month, day = int(y), int(m), int(d)
+    if year < 1 or not 1 <= month <= 12 or not 1 <= day <= calendar.monthrange(year, month)[1]:
+        return None
+    return year * 10000 + month * 100 + day
+
+
+@lru_cache(maxsize=65536)
+def _parse_strptime(text):
+    # The check the trackers have always used, which also takes forms like
+    # "2025-6-7" that older versions stored as typed.
+    try:
+        dt = datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return dt.year * 10000 + dt.month * 100 + dt.day
+
+
+def date_key(text):
+    # "2025-11-04" -> 20251104, or None if text is not a valid YYYY-MM-DD date.
+    if not isinstance(text, str):
+        return None
+    return _parse_iso(text) or _parse_strptime(text)
+
+
+def iso_date(text):
+    # "2025-6-7" -> "2025-06-07"; text that is not a date comes back as is.
+    day = date_key(text)
+    if day is None:
+        return text
+    return f"{day // 10000:04d}-{day // 100 % 100:02d}-{day % 100:02d}"
+
+
+def month_of(day):
+    # 20251104 -> (2025, 11)
+    return day // 10000, day // 100 % 100
+
+
+def month_bounds(year, month):
+    # Day keys k with start <= k < end fall in the given month.
+    start = year * 10000 + month * 100
+    return start, start + 100
+
+
+def normalize_record(record):
+    # Recomputed every time, so a record whose date was edited never keeps
+    # a stale key. date_key() is memoized, so this is a dict lookup.
+    day = record["day"] = date_key(record.get("date", ""))
+    return day
+
+
+def stored_record(record):
+    # The record as written to disk: everything except the derived "day".
+    if "day" not in record:
+        return record
+    return {k: v for k, v in record.items() if k != "day"}
+
+
+def sort_by_day(records):
+    # Returns (records with a valid date in date order, quarantined records).
+    dated = []
+    quarantined = []
+    for e in records:
+        if normalize_record(e) is None:
+            quarantined.append(e)
+        else:
+            dated.append(e)
+    dated.sort(key=lambda e: e["day"])
+    return dated, quarantined
@@ -0,0 +1,450 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+
+from Expense_Dates import normalize_record, stored_record
+from File_Lock import file_lock
+
+# Append-only storage for the expense ledger.
+#
+# The ledger lives in two files:
+#   expenses.json          -> snapshot, a plain JSON list (same format as before)
+#   expenses.json.journal  -> newline-delimited JSON, one record per line
+#
+# Adding an expense only appends one line to the journal. Once the journal
+# grows past COMPACT_RATIO of the snapshot size (and at least COMPACT_BYTES)
+# it is folded back into the snapshot, so the cost of rewriting the snapshot
+# is spread over a number of appends that grows with the ledger.
+#
+# Every record in memory carries an integer "day" key (YYYYMMDD, see
+# Expense_Dates) next to its "date". It is derived from "date" whenever a
+# record is loaded, appended or saved, and stripped before writing, so the
+# files keep the format above. Records with an unparseable date get
+# day=None and are listed by quarantined() rather than dropped.
+#
+# Several processes may share one ledger. Every write holds an exclusive
+# lock on expenses.json.lock and reads hold a shared one, so a reader never
+# sees a half-written journal line or a snapshot whose journal has not been
+# emptied yet. A reader that finds a damaged file drops its shared lock and
+# reads again under the exclusive one before repairing anything. Code that
+# rewrites the whole ledger should use update_records(), which retries if
+# another writer got there first.
+
+JOURNAL_SUFFIX = ".journal"
+BACKUP_SUFFIX = ".bak"
+COMPACT_BYTES = 256 * 1024
+COMPACT_RATIO = 0.25
+LOCK_SUFFIX = ".lock"
+UPDATE_RETRIES = 10
+_SPACE = re.compile(r"[ \t\r\n]*")
+
+# Parsed ledgers kept in memory, keyed by the absolute snapshot path.
+# Each entry is (signature, records); the signature is the inode, size and
+# mtime of both files, so any outside change forces a re-read.
+_cache = {}
+_cache_stats = {"hits": 0, "misses": 0}
+
+# Called as hook(snapshot_file, records, compacted_from) under the write
+# lock each time the snapshot is rewritten, so indexes kept next to the
+# ledger (see Expense_Rollup) are updated in the same critical section.
+# compacted_from is the ledger version that was folded into the snapshot
+# when the rewrite was a compaction, None when the contents changed.
+_rewrite_hooks = []
+
+
+class LedgerConflict(Exception):
+    pass
+
+
+def journal_path(snapshot_file):
+    return snapshot_file + JOURNAL_SUFFIX
+
+
+def ledger_lock(snapshot_file, shared=False, timeout=None):
+    return file_lock(snapshot_file + LOCK_SUFFIX, shared, timeout)
+
+
+def temp_path(filename):
+    # Unique per process and thread, so concurrent writers never share one.
+    return f"{filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_json_atomic(filename, records):
+    tmp = temp_path(filename)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump([stored_record(r) for r in records], f, ensure_ascii=False, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, filename)
+
+
+def _recover_records(text):
+    # Walk the JSON list element by element and keep everything up to the
+    # first record that cannot be decoded.
+    decoder = json.JSONDecoder()
+    records = []
+    idx = text.find("[")
+    if idx == -1:
+        return records
+    idx += 1
+    length = len(text)
+    while idx < length:
+        while idx < length and text[idx] in " \t\r\n,":
+            idx += 1
+        if idx >= length or text[idx] == "]":
+            break
+        try:
+            obj, idx = decoder.raw_decode(text, idx)
+        except json.JSONDecodeError:
+            break
+        if isinstance(obj, dict):
+            records.append(obj)
+    return records
+
+
+def iter_json_records(text):
+    # Yields the objects of a JSON list one at a time, so a caller that
+    # keeps its own compact copy never holds the whole list of dicts.
+    # Raises ValueError if text is not a list of objects.
+    decoder = json.JSONDecoder()
+    space = _SPACE.match
+    idx = space(text, 0).end()
+    if idx == len(text):
+        return
+    if text[idx] != "[":
+        raise ValueError("ledger root is not a list")
+    idx = space(text, idx + 1).end()
+    if text[idx:idx + 1] != "]":
+        while True:
+            record, idx = decoder.raw_decode(text, idx)
+            if not isinstance(record, dict):
+                raise ValueError("ledger entry is not an object")
+            yield record
+            idx = space(text, idx).end()
+            if text[idx:idx + 1] == "]":
+                break
+            if text[idx:idx + 1] != ",":
+                raise ValueError(f"unexpected data at offset {idx}")
+            idx = space(text, idx + 1).end()
+    if space(text, idx + 1).end() != len(text):
+        raise ValueError(f"unexpected data at offset {idx + 1}")
+
+
+def _read_snapshot(snapshot_file, repair=False):
+    # Returns None if the snapshot is damaged and repair is False; repairing
+    # needs the exclusive lock.
+    with open(snapshot_file, "r", encoding="utf-8") as f:
+        text = f.read()
+    try:
+        data = json.loads(text) if text.strip() else []
+        if not isinstance(data, list):
+            raise ValueError(f"{snapshot_file} root is not a list")
+        return data
+    except (json.JSONDecodeError, ValueError):
+        if not repair:
+            return None
+
+    records = _recover_records(text)
+    backup = snapshot_file + BACKUP_SUFFIX
+    try:
+        os.replace(snapshot_file, backup)
+        print(f"[Warning] Corrupted {snapshot_file} moved to {backup}. "
+              f"Recovered {len(records)} record(s).")
+    except OSError:
+        print(f"[Warning] Could not create backup of corrupted {snapshot_file}. "
+              f"Recovered {len(records)} record(s).")
+    _write_json_atomic(snapshot_file, records)
+    return records
+
+
+def replay_journal(snapshot_file, repair=True):
+    # Returns the records stored in the journal. A torn or corrupted line
+    # (e.g. from a crash mid-append) ends the replay and the journal is
+    # truncated back to the last valid record; with repair=False the
+    # journal is left alone and None is returned instead. Truncating needs
+    # the exclusive lock.
+    path = journal_path(snapshot_file)
+    records = []
+    if not os.path.exists(path):
+        return records
+
+    valid_bytes = 0
+    bad_line = None
+    with open(path, "rb") as f:
+        for line_num, raw in enumerate(f, start=1):
+            if not raw.endswith(b"\n"):
+                bad_line = line_num
+                break
+            if raw.strip():
+                try:
+                    record = json.loads(raw.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    bad_line = line_num
+                    break
+                if not isinstance(record, dict):
+                    bad_line = line_num
+                    break
+                records.append(record)
+            valid_bytes += len(raw)
+
+    if bad_line is not None:
+        if not repair:
+            return None
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+        print(f"[Warning] Journal {path} was damaged at line {bad_line}. "
+              f"Recovered {len(records)} record(s).")
+    return records
+
+
+def ensure_ledger(snapshot_file):
+    if not os.path.exists(snapshot_file):
+        _write_json_atomic(snapshot_file, [])
+
+
+def _stat(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_size, st.st_mtime_ns
+
+
+def _signature(snapshot_file):
+    return _stat(snapshot_file), _stat(journal_path(snapshot_file))
+
+
+def cache_info():
+    info = dict(_cache_stats)
+    info["entries"] = len(_cache)
+    return info
+
+
+def clear_cache():
+    _cache.clear()
+    _cache_stats["hits"] = 0
+    _cache_stats["misses"] = 0
+
+
+def _read_ledger(snapshot_file, repair):
+    # (records, signature), or None if a file is missing or damaged and
+    # repair is False.
+    if not os.path.exists(snapshot_file):
+        if not repair:
+            return None
+        ensure_ledger(snapshot_file)
+    records = _read_snapshot(snapshot_file, repair)
+    if records is None:
+        return None
+    journal = replay_journal(snapshot_file, repair)
+    if journal is None:
+        return None
+    records.extend(journal)
+    # Taken under the lock, so it matches exactly what was read.
+    return records, _signature(snapshot_file)
+
+
+def _load(snapshot_file):
+    with ledger_lock(snapshot_file, shared=True):
+        loaded = _read_ledger(snapshot_file, repair=False)
+    if loaded is None:
+        with ledger_lock(snapshot_file):
+            loaded = _read_ledger(snapshot_file, repair=True)
+    records, sig = loaded
+    for record in records:
+        normalize_record(record)
+    return records, sig
+
+
+def load_records(snapshot_file):
+    return _load(snapshot_file)[0]
+
+
+def stream_records(snapshot_file, consume):
+    # Calls consume(record) for each record of the ledger in order, without
+    # building the list. Returns False if a file is missing or damaged; the
+    # caller should then discard what it got and use load_records(), which
+    # repairs it.
+    with ledger_lock(snapshot_file, shared=True):
+        try:
+            with open(snapshot_file, "r", encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return False
+        try:
+            for record in iter_json_records(text):
+                consume(record)
+        except ValueError:  # includes json.JSONDecodeError
+            return False
+        del text
+        try:
+            f = open(journal_path(snapshot_file), "rb")
+        except FileNotFoundError:
+            return True
+        with f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    return False
+                if raw.strip():
+                    try:
+                        record = json.loads(raw.decode("utf-8"))
+                    except (UnicodeDecodeError, json.JSONDecodeError):
+                        return False
+                    if not isinstance(record, dict):
+                        return False
+                    consume(record)
+    return True
+
+
+def _load_entry(snapshot_file):
+    key = os.path.abspath(snapshot_file)
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == _signature(snapshot_file):
+        _cache_stats["hits"] += 1
+        return entry
+
+    _cache_stats["misses"] += 1
+    records, sig = _load(snapshot_file)
+    entry = _cache[key] = (sig, records)
+    return entry
+
+
+def load_cached(snapshot_file):
+    # Same as load_records, but re-reads the files only when they changed
+    # since the last call. Callers get their own list to sort or filter.
+    return list(_load_entry(snapshot_file)[1])
+
+
+def ledger_version(snapshot_file):
+    # Changes whenever the snapshot or the journal does.
+    return _signature(snapshot_file)
+
+
+def snapshot_version(snapshot_file):
+    # Changes whenever the snapshot is rewritten, but not on appends.
+    return _stat(snapshot_file)
+
+
+def journal_size(snapshot_file):
+    try:
+        return os.path.getsize(journal_path(snapshot_file))
+    except FileNotFoundError:
+        return 0
+
+
+def journal_tail(snapshot_file, offset):
+    # Records appended to the journal from byte offset on, and the offset
+    # just past the last complete record read. Stops quietly at a torn or
+    # damaged line; repairing it is left to load_records().
+    records = []
+    try:
+        f = open(journal_path(snapshot_file), "rb")
+    except FileNotFoundError:
+        return records, offset
+    with f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            if raw.strip():
+                try:
+                    record = json.loads(raw.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    break
+                if not isinstance(record, dict):
+                    break
+                normalize_record(record)
+                records.append(record)
+            offset += len(raw)
+    return records, offset
+
+
+def load_versioned(snapshot_file):
+    # (records, version) for write_snapshot(expected_version=...); the
+    # version is the one the records were read at.
+    sig, records = _load_entry(snapshot_file)
+    return list(records), sig
+
+
+def quarantined(snapshot_file):
+    return [r for r in load_cached(snapshot_file) if r.get("day") is None]
+
+
+def add_rewrite_hook(hook):
+    if hook not in _rewrite_hooks:
+        _rewrite_hooks.append(hook)
+
+
+def _replace(snapshot_file, records, compacted_from=None):
+    # The snapshot is replaced first and the journal emptied afterwards, so a
+    # crash in between can only duplicate records, never lose them.
+    _write_json_atomic(snapshot_file, records)
+    path = journal_path(snapshot_file)
+    if os.path.exists(path):
+        with open(path, "w", encoding="utf-8"):
+            pass
+    for record in records:
+        normalize_record(record)
+    _cache[os.path.abspath(snapshot_file)] = (_signature(snapshot_file), list(records))
+    for hook in _rewrite_hooks:
+        hook(snapshot_file, records, compacted_from)
+
+
+def write_snapshot(snapshot_file, records, expected_version=None):
+    # With expected_version, raises LedgerConflict if the ledger changed
+    # since that version was read.
+    with ledger_lock(snapshot_file):
+        if expected_version is not None and _signature(snapshot_file) != expected_version:
+            raise LedgerConflict(f"{snapshot_file} was changed by another writer")
+        _replace(snapshot_file, records)
+
+
+def update_records(snapshot_file, change, retries=UPDATE_RETRIES):
+    # Optimistic read-modify-write: change(records) returns the new list and
+    # is called again on a fresh copy if another writer got in first. The
+    # lock is not held while change() runs, so appends keep flowing.
+    for attempt in range(retries):
+        records, version = load_versioned(snapshot_file)
+        new_records = change(records)
+        try:
+            write_snapshot(snapshot_file, new_records, expected_version=version)
+            return new_records
+        except LedgerConflict:
+            time.sleep(random.uniform(0, 0.01 * 2 ** attempt))
+    raise LedgerConflict(f"{snapshot_file} kept changing; gave up after {retries} attempts")
+
+
+def compact(snapshot_file):
+    with ledger_lock(snapshot_file):
+        records = load_cached(snapshot_file)
+        _replace(snapshot_file, records, compacted_from=_signature(snapshot_file))
+        return records
+
+
+def append_record(snapshot_file, record, compact_bytes=COMPACT_BYTES, compact_ratio=COMPACT_RATIO):
+    normalize_record(record)
+    line = json.dumps(stored_record(record), ensure_ascii=False) + "\n"
+    with ledger_lock(snapshot_file):
+        ensure_ledger(snapshot_file)
+        key = os.path.abspath(snapshot_file)
+        entry = _cache.get(key)
+        fresh = entry is not None and entry[0] == _signature(snapshot_file)
+
+        with open(journal_path(snapshot_file), "a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+
+        # Keep an up-to-date cache current instead of forcing a full re-read.
+        if fresh:
+            entry[1].append(record)
+            _cache[key] = (_signature(snapshot_file), entry[1])
+        else:
+            _cache.pop(key, None)
+
+        if compact_bytes and size >= max(compact_bytes, compact_ratio * os.path.getsize(snapshot_file)):
+            compact(snapshot_file)
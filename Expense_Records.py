@@ -0,0 +1,212 @@
+import math
+from array import array
+from sys import intern
+
+from Expense_Dates import date_key
+from Expense_Journal import iter_json_records, load_records, stream_records
+
+# Compact in-memory expense ledger, stored as parallel arrays:
+#
+#   dates         array('I')  index into the date table
+#   categories    array('I')  index into the category table
+#   descriptions  array('I')  index into the description table
+#   paise         array('q')  amount in paise (1/100 rupee)
+#
+# That is 20 bytes per record plus one copy of each distinct string,
+# against several hundred bytes for a dict or tuple of Python objects.
+# Amounts are whole paise, so totals do not pick up float drift.
+#
+#   table = ExpenseTable.from_ledger("expenses.json")
+#   table = ExpenseTable.from_rows(read_expenses("Expense_Data.txt"))
+#
+# from_ledger() and from_json() decode one record at a time straight into
+# the arrays, so the list of dicts is never built; the files on disk are
+# the same JSON snapshot and journal as always.
+#   table.summary()  -> same shape as Expense_Tracker.calculate_summary()
+
+
+# The one money encoding for every summary: Expense_Tracker, Expense_Columns,
+# Expense_Rollup, Expense_Binary and the trackers' totals all add paise.
+def to_paise(amount):
+    return round(float(amount) * 100)
+
+
+def paise_or_none(amount):
+    # to_paise(), or None if amount is not a finite number. Older versions
+    # let "inf" and "nan" into the ledger; summing code skips those.
+    try:
+        amount = float(amount)
+    except (TypeError, ValueError):
+        return None
+    return round(amount * 100) if math.isfinite(amount) else None
+
+
+def from_paise(paise):
+    return paise / 100
+
+
+class StringTable:
+    # Dictionary encoding: each distinct string is stored once and
+    # referred to by its position, in order of first appearance.
+    __slots__ = ("names", "_codes")
+
+    def __init__(self):
+        self.names = []
+        self._codes = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, text):
+        code = self._codes.get(text)
+        if code is None:
+            code = self._codes[text] = len(self.names)
+            self.names.append(intern(text))
+        return code
+
+
+class Expense:
+    __slots__ = ("date", "day", "category", "paise", "description")
+
+    def __init__(self, date, day, category, paise, description=""):
+        self.date = date
+        self.day = day
+        self.category = category
+        self.paise = paise
+        self.description = description
+
+    @property
+    def amount(self):
+        return from_paise(self.paise)
+
+    def as_dict(self):
+        return {"date": self.date, "category": self.category,
+                "amount": self.amount, "description": self.description, "day": self.day}
+
+    def __repr__(self):
+        return f"Expense({self.date!r}, {self.category!r}, {self.amount:.2f}, {self.description!r})"
+
+
+class ExpenseTable:
+    def __init__(self):
+        self.dates = array("I")
+        self.categories = array("I")
+        self.descriptions = array("I")
+        self.paise = array("q")
+        self.date_table = StringTable()
+        self.category_table = StringTable()
+        self.description_table = StringTable()
+        self.day_keys = []  # day key for each entry of date_table, None if invalid
+        self.skipped = 0    # records left out by extend_*() for an invalid amount
+
+    def __len__(self):
+        return len(self.paise)
+
+    def append(self, date, category, amount, description=""):
+        paise = paise_or_none(amount)
+        if paise is None:
+            raise ValueError(f"Invalid amount: {amount!r}")
+        date = str(date)
+        code = self.date_table.code(date)
+        if code == len(self.day_keys):
+            self.day_keys.append(date_key(date))
+        self.dates.append(code)
+        self.categories.append(self.category_table.code(str(category)))
+        self.descriptions.append(self.description_table.code(str(description)))
+        self.paise.append(paise)
+
+    def extend_rows(self, rows):
+        # rows: iterable of (date, category, amount), as from read_expenses()
+        for date, category, amount in rows:
+            try:
+                self.append(date, category, amount)
+            except ValueError:
+                self.skipped += 1
+
+    def append_record(self, e):
+        # e: an expense dict as stored in expenses.json
+        try:
+            self.append(e.get("date", ""), e.get("category", "Misc"),
+                        e.get("amount", 0.0) or 0.0, e.get("description", ""))
+        except ValueError:
+            self.skipped += 1
+
+    def extend_records(self, records):
+        for e in records:
+            self.append_record(e)
+
+    @classmethod
+    def from_rows(cls, rows):
+        table = cls()
+        table.extend_rows(rows)
+        return table
+
+    @classmethod
+    def from_records(cls, records):
+        table = cls()
+        table.extend_records(records)
+        return table
+
+    @classmethod
+    def from_json(cls, text):
+        # text: a JSON list of expense dicts, as in expenses.json
+        table = cls()
+        for e in iter_json_records(text):
+            table.append_record(e)
+        return table
+
+    @classmethod
+    def from_ledger(cls, snapshot_file):
+        table = cls()
+        if not stream_records(snapshot_file, table.append_record):
+            table = cls.from_records(load_records(snapshot_file))
+        return table
+
+    def __getitem__(self, i):
+        date = self.dates[i]
+        return Expense(self.date_table.names[date], self.day_keys[date],
+                       self.category_table.names[self.categories[i]],
+                       self.paise[i],
+                       self.description_table.names[self.descriptions[i]])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def rows(self):
+        # (date, category, amount) tuples, for code written against read_expenses().
+        dates = self.date_table.names
+        categories = self.category_table.names
+        for d, c, p in zip(self.dates, self.categories, self.paise):
+            yield dates[d], categories[c], p / 100
+
+    def records(self):
+        return [e.as_dict() for e in self]
+
+    def nbytes(self):
+        # Size of the arrays; the string tables are counted separately.
+        return sum(a.itemsize * len(a) for a in (self.dates, self.categories, self.descriptions, self.paise))
+
+    def total_paise(self):
+        return sum(self.paise)
+
+    def summary(self):
+        category_paise = [0] * len(self.category_table)
+        day_paise = [0] * len(self.date_table)
+        for d, c, p in zip(self.dates, self.categories, self.paise):
+            category_paise[c] += p
+            day_paise[d] += p
+
+        highest_day, highest_day_amount = None, 0
+        if day_paise:
+            best = max(range(len(day_paise)), key=day_paise.__getitem__)
+            highest_day = self.date_table.names[best]
+            highest_day_amount = from_paise(day_paise[best])
+
+        return {
+            "total_expense": from_paise(self.total_paise()),
+            "category_totals": {name: from_paise(p)
+                                for name, p in zip(self.category_table.names, category_paise)},
+            "highest_day": highest_day,
+            "highest_day_amount": highest_day_amount
+        }
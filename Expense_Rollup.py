@@ -0,0 +1,175 @@
+import json
+import os
+import sys
+
+from Expense_Columns import COLUMNAR_MIN_ROWS, ExpenseColumns, available
+from Expense_Dates import month_of, normalize_record
+from Expense_Journal import (add_rewrite_hook, journal_size, journal_tail, ledger_lock, load_cached,
+                             snapshot_version, temp_path)
+from Expense_Records import from_paise, paise_or_none
+
+# Month/category totals for the expense ledger, stored next to it as
+# expenses.json.rollup:
+#
+#   {"snapshot": [ino, size, mtime_ns], "offset": 311, "records": 12,
+#    "quarantined": 1, "invalid_amounts": 0,
+#    "months": {"2025-06": {"food": 458800, "travel": 7000000}}}
+#
+# "snapshot" is the stat signature of the snapshot the index was built
+# from and "offset" is how many journal bytes it has seen; amounts are in
+# paise. Records with an amount that is not a finite number, or else with
+# an invalid date, are counted in "invalid_amounts" or "quarantined" and
+# left out of the months. Checking that the index is current takes two stat() calls. If only
+# the journal has grown, the new lines are added to the index; if the
+# snapshot was rewritten, the index is rebuilt. Rewrites made through
+# Expense_Journal in this process update an existing index under the same
+# lock, and a compaction only re-stamps it.
+
+ROLLUP_SUFFIX = ".rollup"
+INDEX_KEYS = ("snapshot", "offset", "records", "quarantined", "invalid_amounts", "months")
+
+
+def rollup_path(snapshot_file):
+    return snapshot_file + ROLLUP_SUFFIX
+
+
+def month_key(year, month):
+    return f"{year:04d}-{month:02d}"
+
+
+def _write_rollup(snapshot_file, index):
+    path = rollup_path(snapshot_file)
+    tmp = temp_path(path)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def _read_rollup(snapshot_file):
+    try:
+        with open(rollup_path(snapshot_file), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if not isinstance(index, dict) or any(k not in index for k in INDEX_KEYS):
+        return None  # missing, or written by an older version
+    return index
+
+
+def _version(snapshot_file):
+    return _as_list(snapshot_version(snapshot_file))
+
+
+def _as_list(version):
+    return None if version is None else list(version)
+
+
+def _is_current(snapshot_file, index):
+    return index["snapshot"] == _version(snapshot_file) and index["offset"] == journal_size(snapshot_file)
+
+
+def _stamp(snapshot_file, index):
+    index["snapshot"] = _version(snapshot_file)
+    index["offset"] = journal_size(snapshot_file)
+
+
+def _add(index, record):
+    paise = paise_or_none(record.get("amount", 0.0) or 0.0)
+    if paise is None:
+        index["invalid_amounts"] += 1
+        return
+    day = normalize_record(record)
+    if day is None:
+        index["quarantined"] += 1
+        return
+    key = month_key(*month_of(day))
+    cat = record.get("category", "Misc")
+    categories = index["months"].setdefault(key, {})
+    categories[cat] = categories.get(cat, 0) + paise
+
+
+def rebuild_rollup(snapshot_file, records=None):
+    # records, if given, must be the current contents of the ledger.
+    with ledger_lock(snapshot_file):
+        if records is None:
+            records = load_cached(snapshot_file)
+        index = {"snapshot": None, "offset": 0, "records": len(records),
+                 "quarantined": 0, "invalid_amounts": 0, "months": {}}
+        if available() and len(records) >= COLUMNAR_MIN_ROWS:
+            columns = ExpenseColumns.from_records(records)
+            index["months"] = columns.month_category_paise()
+            index["quarantined"] = columns.invalid_days()
+            index["invalid_amounts"] = columns.skipped
+        else:
+            for e in records:
+                _add(index, e)
+        _stamp(snapshot_file, index)
+        _write_rollup(snapshot_file, index)
+        return index
+
+
+def _refresh(snapshot_file, index):
+    # Brings index up to date with the ledger; the caller holds the lock.
+    offset = index["offset"] if index is not None else 0
+    if index is None or index["snapshot"] != _version(snapshot_file) or journal_size(snapshot_file) < offset:
+        return rebuild_rollup(snapshot_file)
+    records, end = journal_tail(snapshot_file, offset)
+    if end != offset:
+        for record in records:
+            _add(index, record)
+        index["records"] += len(records)
+        index["offset"] = end
+        _write_rollup(snapshot_file, index)
+    return index
+
+
+def load_rollup(snapshot_file):
+    index = _read_rollup(snapshot_file)
+    if index is not None and _is_current(snapshot_file, index):
+        return index
+    with ledger_lock(snapshot_file):
+        return _refresh(snapshot_file, _read_rollup(snapshot_file))
+
+
+def add_to_rollup(snapshot_file):
+    # Call after appending to the ledger. Adds every journal line the index
+    # has not seen yet, including appends from other processes, without
+    # re-reading the rest of the ledger.
+    with ledger_lock(snapshot_file):
+        return _refresh(snapshot_file, _read_rollup(snapshot_file))
+
+
+def _on_rewrite(snapshot_file, records, compacted_from):
+    index = _read_rollup(snapshot_file)
+    if index is None:
+        return  # built on first use
+    if compacted_from is not None:
+        snapshot, journal = compacted_from
+        if (index["snapshot"] == _as_list(snapshot) and index["offset"] <= (journal[1] if journal else 0)
+                and index["records"] <= len(records)):
+            # The index covers a prefix of the compacted ledger; records
+            # are in ledger order, so only the rest needs adding.
+            for record in records[index["records"]:]:
+                _add(index, record)
+            index["records"] = len(records)
+            _stamp(snapshot_file, index)
+            _write_rollup(snapshot_file, index)
+            return
+    rebuild_rollup(snapshot_file, records)
+
+
+add_rewrite_hook(_on_rewrite)
+
+
+def month_summary(index, year, month):
+    paise = index["months"].get(month_key(year, month), {})
+    summary_by_category = {category: from_paise(p) for category, p in paise.items()}
+    return summary_by_category, from_paise(sum(paise.values()))
+
+
+if __name__ == "__main__":
+    # python Expense_Rollup.py [expenses.json]
+    ledger = sys.argv[1] if len(sys.argv) > 1 else "expenses.json"
+    rebuilt = rebuild_rollup(ledger)
+    print(f"Rebuilt {rollup_path(ledger)}: {rebuilt['records']} record(s), "
+          f"{len(rebuilt['months'])} month(s).")
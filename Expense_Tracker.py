@@ -1,48 +1,172 @@
+import glob
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
-def read_expenses(filename):
-    records = []
+from Expense_Columns import ExpenseColumns
+from Expense_Records import ExpenseTable, from_paise, paise_or_none
+from Profiler import profiled
+
+
+CHUNK_SIZE = 10000
+
+
+def iter_expense_chunks(filename, chunk_size=CHUNK_SIZE, on_skip=None):
+    # Yields lists of at most chunk_size (date, category, amount) tuples,
+    # so only one chunk is ever held in memory.
+    chunk = []
     try:
         with open(filename, 'r') as file:
             for line_num, line in enumerate(file, start=1):
                 parts = line.strip().split(',')
                 if len(parts) != 3:
                     print(f" Skipping line {line_num}: {line.strip()}")
+                    if on_skip:
+                        on_skip(line_num, line)
                     continue
                 date, category, amount = parts
                 try:
                     amount = float(amount)
-                    records.append((date, category, amount))
+                    if not math.isfinite(amount):
+                        raise ValueError(amount)
                 except ValueError:
                     print(f"Skipping line {line_num} due to invalid amount: {amount}")
+                    if on_skip:
+                        on_skip(line_num, line)
                     continue
+                chunk.append((date, category, amount))
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
     except FileNotFoundError:
         print(f"File '{filename}' not found.")
-        return []
+        return
+    if chunk:
+        yield chunk
+
+
+def read_expenses(filename):
+    records = []
+    for chunk in iter_expense_chunks(filename):
+        records.extend(chunk)
     return records
 
 
+def read_expense_table(filename, chunk_size=CHUNK_SIZE):
+    # Same records as read_expenses(), held as a compact ExpenseTable.
+    table = ExpenseTable()
+    for chunk in iter_expense_chunks(filename, chunk_size):
+        table.extend_rows(chunk)
+    return table
+
+
+class SummaryAccumulator:
+    # Running totals for calculate_summary(); memory grows with the number
+    # of distinct categories and days, not with the number of records.
+    # Totals are kept in integer paise, so merging partial results gives
+    # exactly the same numbers as one pass over all records.
+    def __init__(self):
+        self.total_paise = 0
+        self.category_totals = {}
+        self.day_totals = {}
+        self.records = 0
+        self.skipped = 0
+
+    @property
+    def total_expense(self):
+        return from_paise(self.total_paise)
+
+    def add(self, records):
+        category_totals = self.category_totals
+        day_totals = self.day_totals
+        total_paise = self.total_paise
+        count = 0
+        skipped = 0
+        for date, category, amount in records:
+            paise = paise_or_none(amount)
+            if paise is None:
+                skipped += 1
+                continue
+            total_paise += paise
+            category_totals[category] = category_totals.get(category, 0) + paise
+            day_totals[date] = day_totals.get(date, 0) + paise
+            count += 1
+        self.total_paise = total_paise
+        self.records += count
+        self.skipped += skipped
+
+    def skip(self, line_num=None, line=None):
+        self.skipped += 1
+
+    def merge(self, other):
+        # Folding partials in input order gives the same dict ordering (and
+        # so the same highest_day tie-break) as one pass over all records.
+        self.total_paise += other.total_paise
+        for category, amount in other.category_totals.items():
+            self.category_totals[category] = self.category_totals.get(category, 0) + amount
+        for date, amount in other.day_totals.items():
+            self.day_totals[date] = self.day_totals.get(date, 0) + amount
+        self.records += other.records
+        self.skipped += other.skipped
+
+    def result(self):
+        day_totals = self.day_totals
+        if day_totals:
+            highest_day = max(day_totals, key=day_totals.get)
+            highest_day_amount = from_paise(day_totals[highest_day])
+        else:
+            highest_day, highest_day_amount = None, 0
+
+        return {
+            "total_expense": self.total_expense,
+            "category_totals": {category: from_paise(p) for category, p in self.category_totals.items()},
+            "highest_day": highest_day,
+            "highest_day_amount": highest_day_amount
+        }
+
+
 def calculate_summary(records):
-    category_totals = {}
-    day_totals = {}
-    total_expense = 0
-
-    for date, category, amount in records:
-        total_expense += amount
-        category_totals[category] = category_totals.get(category, 0) + amount
-        day_totals[date] = day_totals.get(date, 0) + amount
-
-    if day_totals:
-        highest_day = max(day_totals, key=day_totals.get)
-        highest_day_amount = day_totals[highest_day]
+    if isinstance(records, ExpenseColumns):
+        return records.summary()
+    if isinstance(records, ExpenseTable):
+        return records.summary()
+
+    acc = SummaryAccumulator()
+    acc.add(records)
+    return acc.result()
+
+
+def summarize_file(filename, chunk_size=CHUNK_SIZE):
+    # Streaming equivalent of calculate_summary(read_expenses(filename)).
+    acc = SummaryAccumulator()
+    for chunk in iter_expense_chunks(filename, chunk_size, on_skip=acc.skip):
+        acc.add(chunk)
+    return acc
+
+
+def expand_inputs(target):
+    # A directory means every *.txt inside it; anything else is a glob.
+    if os.path.isdir(target):
+        target = os.path.join(target, "*.txt")
+    return sorted(glob.glob(target))
+
+
+def summarize_files(filenames, workers=None, chunk_size=CHUNK_SIZE):
+    # Parses each file in its own process and merges the partial summaries.
+    # Returns (merged accumulator, [(filename, partial accumulator), ...]).
+    filenames = list(filenames)
+    if len(filenames) <= 1 or workers == 1:
+        partials = [summarize_file(f, chunk_size) for f in filenames]
     else:
-        highest_day, highest_day_amount = None, 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            partials = list(pool.map(summarize_file, filenames, repeat(chunk_size)))
 
-    return {
-        "total_expense": total_expense,
-        "category_totals": category_totals,
-        "highest_day": highest_day,
-        "highest_day_amount": highest_day_amount
-    }
+    merged = SummaryAccumulator()
+    for partial in partials:
+        merged.merge(partial)
+    return merged, list(zip(filenames, partials))
 
 
 def write_summary(summary, filename):
@@ -60,17 +184,33 @@ def write_summary(summary, filename):
         file.write("=================================================================\n")
     print(f"Summary written to {filename}")
 
-import os
-def main():
+@profiled("expense_tracker")
+def main(inputs=None, workers=None):
     input_file = "Expense_Data.txt"
     output_file = "Expense.txt"
-    records = read_expenses(input_file)
-    if not records:
+    if inputs is None:
+        acc = summarize_file(input_file)
+    else:
+        files = expand_inputs(inputs)
+        if not files:
+            print(f"No input files match '{inputs}'.")
+            return
+        acc, partials = summarize_files(files, workers)
+        for filename, partial in partials:
+            print(f"{filename}: {partial.records} record(s), ₹{partial.total_expense:.2f}")
+    if not acc.records:
         print("No valid records to process.")
         return
+    if acc.skipped:
+        print(f"Skipped {acc.skipped} invalid line(s).")
 
-    summary = calculate_summary(records)
+    summary = acc.result()
     write_summary(summary, output_file)
     os.startfile(output_file)
 
 
+if __name__ == "__main__":
+    # python Expense_Tracker.py [directory-or-glob] [workers] [--profile]
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    main(args[0] if len(args) > 0 else None,
+         int(args[1]) if len(args) > 1 else None)
@@ -0,0 +1,140 @@
+import sqlite3
+import sys
+
+from Expense_Dates import date_key, iso_date
+from Expense_Journal import load_records
+
+# SQLite backend for the expense trackers. Select it with
+# EXPENSE_BACKEND=sqlite; migrate an existing ledger with
+#   python Expense_db.py migrate [expenses.json] [expenses.db]
+
+DB_FILE = "expenses.db"
+# Dates are stored as YYYY-MM-DD, so string order is date order.
+ISO_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]"
+
+_connections = {}
+
+
+def create_connection(db_name):
+    con = None
+    try:
+        con = sqlite3.connect(db_name)
+    except sqlite3.Error as e:
+        print(f"Error occurred in Creating Connection: {e}")
+    return con
+
+
+def create_table(con):
+    try:
+        cursor = con.cursor()
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS Expenses(
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                date TEXT NOT NULL,
+                category TEXT NOT NULL,
+                amount REAL NOT NULL,
+                description TEXT NOT NULL DEFAULT ''
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_date ON Expenses(date)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_expenses_category_date ON Expenses(category, date)")
+        # Rows written before dates were normalized, e.g. "2025-6-7".
+        con.create_function("iso_date", 1, iso_date, deterministic=True)
+        cursor.execute("UPDATE Expenses SET date = iso_date(date) WHERE date NOT GLOB ?", (ISO_GLOB,))
+        con.commit()
+    except sqlite3.Error as e:
+        print(f"An error occurred while creating the Table: {e}")
+
+
+def open_ledger(db_name=DB_FILE):
+    # One connection per database file for the life of the process.
+    con = _connections.get(db_name)
+    if con is None:
+        con = create_connection(db_name)
+        create_table(con)
+        _connections[db_name] = con
+    return con
+
+
+def _row(record):
+    return (
+        iso_date(record.get("date", "")),
+        record.get("category", "Misc"),
+        float(record.get("amount", 0.0) or 0.0),
+        record.get("description", "") or "",
+    )
+
+
+def insert_expense(con, record):
+    with con:
+        con.execute(
+            "INSERT INTO Expenses (date, category, amount, description) VALUES (?, ?, ?, ?)",
+            _row(record)
+        )
+
+
+def replace_all(con, records):
+    with con:
+        con.execute("DELETE FROM Expenses")
+        con.executemany(
+            "INSERT INTO Expenses (date, category, amount, description) VALUES (?, ?, ?, ?)",
+            (_row(r) for r in records)
+        )
+
+
+def count_expenses(con):
+    return con.execute("SELECT COUNT(*) FROM Expenses").fetchone()[0]
+
+
+def count_undated(con):
+    # Rows whose date is not a valid YYYY-MM-DD date.
+    cursor = con.execute("SELECT date, COUNT(*) FROM Expenses GROUP BY date")
+    return sum(n for d, n in cursor if date_key(d) is None)
+
+
+def fetch_expenses(con):
+    # Walks idx_expenses_date, so rows come back already sorted by date.
+    cursor = con.execute(
+        "SELECT date, category, amount, description FROM Expenses ORDER BY date, id"
+    )
+    return [
+        {"date": d, "category": c, "amount": a, "description": desc}
+        for d, c, a, desc in cursor
+    ]
+
+
+def month_summary(con, year, month):
+    # String bounds, so any year the menus accept works; every
+    # YYYY-MM-DD of the month sorts between them.
+    start = f"{year:04d}-{month:02d}-01"
+    end = f"{year:04d}-{month:02d}-32"
+    cursor = con.execute(
+        "SELECT category, SUM(amount) FROM Expenses "
+        "WHERE date >= ? AND date < ? GROUP BY category ORDER BY MIN(id)",
+        (start, end)
+    )
+    summary_by_category = {}
+    month_total = 0.0
+    for cat, amt in cursor:
+        summary_by_category[cat] = amt
+        month_total += amt
+    return summary_by_category, month_total
+
+
+def migrate_from_json(json_file="expenses.json", db_name=DB_FILE):
+    records = load_records(json_file)
+    con = open_ledger(db_name)
+    try:
+        replace_all(con, records)
+    except sqlite3.Error as e:
+        print(f"Error occurred while migrating {json_file}: {e}")
+        return 0
+    print(f"Migrated {len(records)} expense(s) from {json_file} to {db_name}")
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        migrate_from_json(*sys.argv[2:4])
+    else:
+        print("Usage: python Expense_db.py migrate [expenses.json] [expenses.db]")
@@ -0,0 +1,95 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+# Advisory inter-process file locks.
+#
+#   with file_lock("expenses.json.lock"):
+#       ...   # no other process holds this lock
+#
+# Uses fcntl.flock on POSIX and msvcrt.locking on Windows, where every lock
+# is exclusive. Locks are reentrant per thread: a nested file_lock() on a
+# path this thread already holds just passes through. A nested shared lock
+# inside an exclusive one is fine, but asking for the exclusive lock while
+# holding only the shared one raises RuntimeError, so take the exclusive
+# lock first if you need both.
+
+POLL_INTERVAL = 0.01
+
+_held = threading.local()
+
+
+def _acquire(fd, shared, timeout):
+    deadline = None if timeout is None else time.monotonic() + timeout
+    if fcntl is not None:
+        mode = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+        if deadline is None:
+            fcntl.flock(fd, mode)
+            return True
+        while True:
+            try:
+                fcntl.flock(fd, mode | fcntl.LOCK_NB)
+                return True
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    return False
+                time.sleep(POLL_INTERVAL)
+    if msvcrt is not None:
+        while True:
+            try:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                return True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+                time.sleep(POLL_INTERVAL)
+    return True
+
+
+def _release(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    elif msvcrt is not None:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path, shared=False, timeout=None):
+    held = _held.__dict__.setdefault("locks", {})
+    key = os.path.abspath(path)
+    if key in held:
+        count, held_shared = held[key]
+        if held_shared and not shared:
+            raise RuntimeError(f"Cannot upgrade the shared lock on {path} to an exclusive one")
+        held[key] = (count + 1, held_shared)
+        try:
+            yield
+        finally:
+            held[key] = (held[key][0] - 1, held_shared)
+        return
+
+    fd = os.open(key, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if not _acquire(fd, shared, timeout):
+            raise TimeoutError(f"Timed out waiting for lock on {path}")
+        held[key] = (1, shared)
+        try:
+            yield
+        finally:
+            del held[key]
+            _release(fd)
+    finally:
+        os.close(fd)
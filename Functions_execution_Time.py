@@ -1,13 +1,11 @@
 import time
 
+from Perf_Metrics import instrument
+
 def measure_time(func):
-    def wrapper(*args, **kwargs):
-        start = time.time()
-        result = func(*args, **kwargs)
-        end = time.time()
-        print(f"{func.__name__} executed in {end - start:.6f} seconds")
-        return result
-    return wrapper
+    def report(duration, error, phases):
+        print(f"{func.__name__} executed in {duration:.6f} seconds")
+    return instrument(func, on_done=report)
 @measure_time
 def func1():
     sum([i for i in range(1000000)])
@@ -0,0 +1,125 @@
+import atexit
+import os
+import queue
+import threading
+import time
+
+# Shared background log writer. Callers only put a line on a queue; one
+# thread per log file drains the queue and appends lines in batches.
+#
+#   log_line("app_log.txt", "2025-11-06 10:49:14 something happened\n")
+#
+# A batch is written when it reaches batch_size lines, when flush_interval
+# seconds have passed, on flush(), and at interpreter exit. The file is
+# rotated to name.1, name.2, ... once it grows past max_bytes.
+
+BATCH_SIZE = 256
+FLUSH_INTERVAL = 1.0
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+
+_STOP = object()
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+class BufferedLogWriter:
+    def __init__(self, filename, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_bytes=MAX_BYTES, backup_count=BACKUP_COUNT, encoding="utf-8"):
+        self.filename = filename
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.encoding = encoding
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name=f"log-writer:{filename}", daemon=True)
+        self._thread.start()
+
+    def write(self, line):
+        self._queue.put(line)
+
+    def flush(self, timeout=None):
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=None):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, str):
+                batch.append(item)
+                if len(batch) < self.batch_size:
+                    continue
+            if batch:
+                self._write_batch(batch)
+                batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write_batch(self, batch):
+        try:
+            if self._file is None:
+                self._file = open(self.filename, "a", encoding=self.encoding)
+            self._file.write("".join(batch))
+            self._file.flush()
+            if self.max_bytes and self._file.tell() >= self.max_bytes:
+                self._rotate()
+        except OSError as e:
+            print(f"[Warning] Could not write to {self.filename}: {e}")
+
+    def _rotate(self):
+        self._file.close()
+        self._file = None
+        if self.backup_count <= 0:
+            open(self.filename, "w").close()
+            return
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.filename}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.filename}.{i + 1}")
+        os.replace(self.filename, f"{self.filename}.1")
+
+
+def get_writer(filename, **options):
+    # Keyed by absolute path, so a later chdir() does not redirect the lines.
+    filename = os.path.abspath(filename)
+    with _writers_lock:
+        writer = _writers.get(filename)
+        if writer is None:
+            writer = _writers[filename] = BufferedLogWriter(filename, **options)
+        return writer
+
+
+def log_line(filename, line):
+    get_writer(filename).write(line)
+
+
+def flush_all(timeout=None):
+    for writer in list(_writers.values()):
+        writer.flush(timeout)
+
+
+@atexit.register
+def close_all():
+    for writer in list(_writers.values()):
+        writer.close(timeout=5.0)
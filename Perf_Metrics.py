@@ -0,0 +1,243 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# In-process performance metrics for the timing decorators.
+#
+#   @instrument
+#   def load_expenses(): ...
+#
+#   registry.snapshot()           -> {name: {"calls", "errors", "p50", ...}}
+#   registry.to_json()            -> JSON text
+#   registry.to_prometheus()      -> Prometheus text exposition format
+#
+# Inside an instrumented call, time can be attributed to phases:
+#
+#   with phase("load"):
+#       data = load_expenses()
+#   amount = timed_input("Enter amount: ")     # counted as "input"
+#
+# Whatever is not inside a phase is counted as "compute". Each phase gets
+# its own histogram next to the function's total.
+#
+# Set PERF_METRICS_FILE=metrics.json (or metrics.prom) to dump the registry
+# when the process exits.
+
+# Histogram bucket upper bounds in seconds: 10us doubling up to ~84s.
+BUCKETS = tuple(0.00001 * 2 ** i for i in range(24))
+
+PHASES = ("input", "load", "compute", "save", "render")
+
+_local = threading.local()
+
+
+class FunctionStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.phases = {}
+
+    def observe(self, duration, error=False):
+        self.calls += 1
+        if error:
+            self.errors += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+        self.counts[bisect_left(BUCKETS, duration)] += 1
+
+    def percentile(self, q):
+        if not self.calls:
+            return 0.0
+        rank = q * self.calls
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(value, self.max)
+            seen += count
+        return self.max
+
+    def summary(self):
+        info = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total": self.total,
+            "mean": self.total / self.calls if self.calls else 0.0,
+            "max": self.max,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+        if self.phases:
+            info["phases"] = {name: stats.summary() for name, stats in _ordered(self.phases)}
+        return info
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, duration, error=False, phases=None):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = FunctionStats()
+            stats.observe(duration, error)
+            for phase_name, phase_duration in (phases or {}).items():
+                phase_stats = stats.phases.get(phase_name)
+                if phase_stats is None:
+                    phase_stats = stats.phases[phase_name] = FunctionStats()
+                phase_stats.observe(phase_duration)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.summary() for name, stats in sorted(self._stats.items())}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self):
+        with self._lock:
+            items = [(name.replace("\\", "\\\\").replace('"', '\\"'), stats)
+                     for name, stats in sorted(self._stats.items())]
+            lines = ["# HELP function_calls_total Number of calls per function.",
+                     "# TYPE function_calls_total counter"]
+            for label, stats in items:
+                lines.append(f'function_calls_total{{function="{label}"}} {stats.calls}')
+
+            lines += ["# HELP function_errors_total Number of calls that raised.",
+                      "# TYPE function_errors_total counter"]
+            for label, stats in items:
+                lines.append(f'function_errors_total{{function="{label}"}} {stats.errors}')
+
+            lines += ["# HELP function_duration_seconds Call latency per function.",
+                      "# TYPE function_duration_seconds histogram"]
+            for label, stats in items:
+                cumulative = 0
+                for bound, count in zip(BUCKETS, stats.counts):
+                    cumulative += count
+                    lines.append(f'function_duration_seconds_bucket{{function="{label}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'function_duration_seconds_bucket{{function="{label}",le="+Inf"}} {stats.calls}')
+                lines.append(f'function_duration_seconds_sum{{function="{label}"}} {stats.total}')
+                lines.append(f'function_duration_seconds_count{{function="{label}"}} {stats.calls}')
+
+            lines += ["# HELP function_phase_duration_seconds Time per call spent in each phase.",
+                      "# TYPE function_phase_duration_seconds histogram"]
+            for label, stats in items:
+                for phase_name, phase_stats in _ordered(stats.phases):
+                    labels = f'function="{label}",phase="{phase_name}"'
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, phase_stats.counts):
+                        cumulative += count
+                        lines.append(f'function_phase_duration_seconds_bucket{{{labels},le="{bound:g}"}} {cumulative}')
+                    lines.append(f'function_phase_duration_seconds_bucket{{{labels},le="+Inf"}} {phase_stats.calls}')
+                    lines.append(f'function_phase_duration_seconds_sum{{{labels}}} {phase_stats.total}')
+                    lines.append(f'function_phase_duration_seconds_count{{{labels}}} {phase_stats.calls}')
+        return "\n".join(lines) + "\n"
+
+    def dump(self, filename, fmt=None):
+        if fmt is None:
+            fmt = "prometheus" if filename.endswith(".prom") else "json"
+        text = self.to_prometheus() if fmt == "prometheus" else self.to_json()
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+registry = MetricsRegistry()
+
+
+def _ordered(phases):
+    return sorted(phases.items(), key=lambda item: (
+        PHASES.index(item[0]) if item[0] in PHASES else len(PHASES), item[0]))
+
+
+def format_phases(phases):
+    return ", ".join(f"{name} {duration:.4f}s" for name, duration in _ordered(phases))
+
+
+@contextmanager
+def phase(name):
+    # Adds the time spent in the block to every instrumented call running on
+    # this thread. Nested phases count only their own time, not their children's.
+    calls = getattr(_local, "calls", None)
+    if not calls:
+        yield
+        return
+    stack = _local.phase_stack
+    frame = [0.0]
+    stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stack.pop()
+        if stack:
+            stack[-1][0] += elapsed
+        own = elapsed - frame[0]
+        for phases in calls:
+            phases[name] = phases.get(name, 0.0) + own
+
+
+def timed_input(prompt=""):
+    with phase("input"):
+        return input(prompt)
+
+
+def instrument(func=None, *, name=None, on_done=None, metrics=registry):
+    # Records call count, latency, errors and per-phase time for func in the
+    # registry. on_done(duration, error, phases) is called after every call,
+    # for decorators that also want to print or log the timing.
+    def decorate(func):
+        metric_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not hasattr(_local, "calls"):
+                _local.calls = []
+                _local.phase_stack = []
+            phases = {}
+            _local.calls.append(phases)
+            start = time.perf_counter()
+            error = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                _local.calls.pop()
+                attributed = sum(phases.values())
+                phases["compute"] = phases.get("compute", 0.0) + max(0.0, duration - attributed)
+                metrics.record(metric_name, duration, error, phases)
+                if on_done is not None:
+                    on_done(duration, error, phases)
+        return wrapper
+
+    if func is not None:
+        return decorate(func)
+    return decorate
+
+
+@atexit.register
+def _dump_on_exit():
+    filename = os.environ.get("PERF_METRICS_FILE")
+    if filename:
+        registry.dump(filename)
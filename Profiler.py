@@ -0,0 +1,120 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from functools import wraps
+
+# Opt-in profiling for the CLIs. Enable with either
+#   APP_PROFILE=cprofile|sample|both python smart_Expense.py
+#   python smart_Expense.py --profile[=cprofile|sample|both]
+#
+# "cprofile" writes <name>-<time>.pstats plus a text report sorted by
+# cumulative time; it sees every call, including C functions such as
+# datetime.strptime and sqlite3 execute. "sample" runs a low-overhead stack
+# sampler and writes <name>-<time>.collapsed, one "frame;frame;frame count"
+# line per stack, ready for flamegraph.pl or speedscope.
+# Files go to APP_PROFILE_DIR (default "profiles").
+
+PROFILE_ENV = "APP_PROFILE"
+PROFILE_DIR_ENV = "APP_PROFILE_DIR"
+SAMPLE_INTERVAL = 0.005
+MODES = ("cprofile", "sample", "both")
+
+
+def requested_mode():
+    for arg in sys.argv[1:]:
+        if arg == "--profile":
+            return "cprofile"
+        if arg.startswith("--profile="):
+            return arg.split("=", 1)[1]
+    return os.environ.get(PROFILE_ENV) or None
+
+
+class StackSampler:
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                module = os.path.splitext(os.path.basename(code.co_filename))[0]
+                names.append(f"{module}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(names))] += 1
+
+    def write_collapsed(self, filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+@contextmanager
+def profile_session(name, mode=None):
+    mode = mode or requested_mode()
+    if not mode:
+        yield
+        return
+    if mode not in MODES:
+        print(f"[Warning] Unknown profile mode '{mode}', expected one of {', '.join(MODES)}.")
+        yield
+        return
+
+    out_dir = os.environ.get(PROFILE_DIR_ENV, "profiles")
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+
+    profiler = cProfile.Profile() if mode in ("cprofile", "both") else None
+    sampler = StackSampler() if mode in ("sample", "both") else None
+    if sampler:
+        sampler.start()
+    if profiler:
+        profiler.enable()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(base + ".pstats")
+            report = io.StringIO()
+            pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(50)
+            with open(base + ".txt", "w", encoding="utf-8") as f:
+                f.write(report.getvalue())
+        if sampler:
+            sampler.stop()
+            sampler.write_collapsed(base + ".collapsed")
+        print(f"Profile ({mode}, {elapsed:.2f}s) written to {base}.*")
+
+
+def profiled(name):
+    # Decorator for CLI entry points; a no-op unless profiling is requested.
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_session(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
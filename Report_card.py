@@ -1,32 +1,126 @@
-def read_marks(filename):
-    students = {}
+import argparse
+import csv
+import heapq
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+
+HEADER = "student_id"
+
+
+def iter_marks(filename):
+    # Yields (student_id, name, subject, marks) one row at a time.
     try:
         with open(filename, 'r') as file:
             for line_no, line in enumerate(file, start=1):
+                if line_no == 1 and line.strip().lower().startswith(HEADER):
+                    continue
                 try:
                     student_id, name, subject, marks = line.strip().split(',')
                     student_id = int(student_id)
                     marks = int(marks)
                 except ValueError:
                     print(f"Skipping  line {line_no}: {line.strip()}")
-                    continue  
+                    continue
+                yield student_id, name, subject, marks
+    except FileNotFoundError:
+        print(f"Error: File '{filename}' not found.")
 
-                if student_id not in students:
-                    students[student_id] = {
-                        "name": name,
-                        "subjects": {}
-                    }
 
-                students[student_id]["subjects"][subject] = marks
+def read_marks(filename):
+    students = {}
+    for student_id, name, subject, marks in iter_marks(filename):
+        if student_id not in students:
+            students[student_id] = {
+                "name": name,
+                "subjects": {}
+            }
 
-    except FileNotFoundError:
-        print(f"Error: File '{filename}' not found.")
-        return {}
+        students[student_id]["subjects"][subject] = marks
 
     return students
 
 
-def generate_report(students):
+class StudentAggregate:
+    # Running totals for one student; individual marks are not kept.
+    __slots__ = ("name", "total", "count", "highest", "lowest")
+
+    def __init__(self, name):
+        self.name = name
+        self.total = 0
+        self.count = 0
+        self.highest = None
+        self.lowest = None
+
+    def add(self, subject, marks):
+        self.total += marks
+        self.count += 1
+        # Strict comparisons keep the first subject on a tie, like max()/min().
+        if self.highest is None or marks > self.highest[1]:
+            self.highest = (subject, marks)
+        if self.lowest is None or marks < self.lowest[1]:
+            self.lowest = (subject, marks)
+
+    @property
+    def average(self):
+        return self.total / self.count
+
+    def report(self, student_id):
+        return {
+            "student_id": student_id,
+            "name": self.name,
+            "total": self.total,
+            "average": self.average,
+            "highest": self.highest,
+            "lowest": self.lowest
+        }
+
+
+class ReportCardEngine:
+    # Streaming report cards: each marks row updates only its own student.
+    #
+    #   engine = ReportCardEngine()
+    #   engine.add_file("Student_Data.txt")
+    #   engine.top_k(10)          # leaderboard, without sorting everyone
+    #   engine.add_row(103, "Ravi", "Math", 91)
+    #   engine.reports()          # same as generate_report(read_marks(...))
+    #
+    # Unlike read_marks(), a second row for the same student and subject
+    # counts as another mark instead of replacing the first.
+    def __init__(self):
+        self.students = {}
+
+    def __len__(self):
+        return len(self.students)
+
+    def add_row(self, student_id, name, subject, marks):
+        student = self.students.get(student_id)
+        if student is None:
+            student = self.students[student_id] = StudentAggregate(name)
+        student.add(subject, marks)
+
+    def add_rows(self, rows):
+        for row in rows:
+            self.add_row(*row)
+        return self
+
+    def add_file(self, filename):
+        return self.add_rows(iter_marks(filename))
+
+    def report(self, student_id):
+        return self.students[student_id].report(student_id)
+
+    def top_k(self, k):
+        # heapq.nlargest keeps the same order as a full stable sort.
+        best = heapq.nlargest(k, self.students.items(), key=lambda item: item[1].average)
+        return [student.report(student_id) for student_id, student in best]
+
+    def reports(self):
+        ranked = sorted(self.students.items(), key=lambda item: item[1].average, reverse=True)
+        return [student.report(student_id) for student_id, student in ranked]
+
+
+def generate_report(students, top_k=None):
     report_data = []
 
     for student_id, data in students.items():
@@ -45,34 +139,134 @@ def generate_report(students):
             "lowest": (lowest_subject, subjects[lowest_subject])
         })
 
+    if top_k is not None:
+        return heapq.nlargest(top_k, report_data, key=lambda x: x["average"])
     report_data.sort(key=lambda x: x["average"], reverse=True)
     return report_data
 
 
-def write_summary(report_data, filename):
-    with open(filename, 'w') as file:
+RENDER_CHUNK = 5000
+WRITE_BUFFER = 1 << 20
+
+
+BLOCK = ("Student ID: {}\nName: {}\nTotal Marks: {}\nAverage Marks: {:.2f}\n"
+         "Highest Scored Subject: {} ({})\nLowest Scored Subject: {} ({})\n\n")
+
+
+def render_rows(rows):
+    # rows are flat tuples, see _flat(); worker processes get these
+    # because tuples pickle much faster than the report dicts.
+    block = BLOCK.format
+    return "".join([block(*row) for row in rows])
+
+
+def _flat(student):
+    return (student["student_id"], student["name"], student["total"], student["average"],
+            *student["highest"], *student["lowest"])
+
+
+def render_block(student):
+    return BLOCK.format(*_flat(student))
+
+
+def render_chunk(report_data):
+    return render_rows(map(_flat, report_data))
+
+
+def render_blocks(report_data, workers=None, chunk_size=RENDER_CHUNK, pool=None):
+    # Yields rendered text for chunk_size students at a time, in order.
+    # With workers > 1 (or a pool) the chunks are formatted in worker processes.
+    chunks = [report_data[i:i + chunk_size] for i in range(0, len(report_data), chunk_size)]
+    if pool is None and workers and workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from render_blocks(report_data, chunk_size=chunk_size, pool=pool)
+        return
+    if pool is None:
+        yield from map(render_chunk, chunks)
+    else:
+        yield from pool.map(render_rows, [[_flat(s) for s in chunk] for chunk in chunks])
+
+
+def write_summary(report_data, filename, workers=None, pool=None):
+    # Rendered chunks go out as a few large writes through a 1 MiB buffer.
+    with open(filename, 'w', buffering=WRITE_BUFFER) as file:
+        for text in render_blocks(report_data, workers, pool=pool):
+            file.write(text)
+
+
+def shard_by_id(shard_size):
+    # Shard key for write_sharded(): students 0..shard_size-1 go to shard 0, ...
+    return lambda student: student["student_id"] // shard_size
+
+
+def write_sharded(report_data, pattern, shard_key, workers=None):
+    # Writes each student to pattern.format(shard=shard_key(student)), keeping
+    # the ranking order within every file. shard_key can be shard_by_id(n) or
+    # any function of the report, e.g. a lookup of the student's class.
+    # Returns {filename: number of students}.
+    shards = {}
+    for student in report_data:
+        shards.setdefault(pattern.format(shard=shard_key(student)), []).append(student)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    try:
+        for filename, students in shards.items():
+            write_summary(students, filename, pool=pool)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return {filename: len(students) for filename, students in shards.items()}
+
+
+def write_jsonl(report_data, filename):
+    with open(filename, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as file:
         for student in report_data:
-            file.write(f"Student ID: {student['student_id']}\n")
-            file.write(f"Name: {student['name']}\n")
-            file.write(f"Total Marks: {student['total']}\n")
-            file.write(f"Average Marks: {student['average']:.2f}\n")
-            file.write(f"Highest Scored Subject: {student['highest'][0]} ({student['highest'][1]})\n")
-            file.write(f"Lowest Scored Subject: {student['lowest'][0]} ({student['lowest'][1]})\n")
-            file.write("\n")
+            file.write(json.dumps(student, ensure_ascii=False) + "\n")
+
+
+CSV_FIELDS = ["student_id", "name", "total", "average",
+              "highest_subject", "highest_marks", "lowest_subject", "lowest_marks"]
 
 
-def main():
+def write_csv(report_data, filename):
+    with open(filename, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER) as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_FIELDS)
+        writer.writerows(
+            (s["student_id"], s["name"], s["total"], f"{s['average']:.2f}",
+             s["highest"][0], s["highest"][1], s["lowest"][0], s["lowest"][1])
+            for s in report_data)
+
+
+def main(top_k=None, workers=None, shard_size=None, jsonl_file=None, csv_file=None):
     input_file = "Student_Data.txt"
     output_file = "report.txt"
 
-    students = read_marks(input_file)
-    if not students:
+    engine = ReportCardEngine().add_file(input_file)
+    if not engine:
         print("No valid data to process.")
         return
 
-    report_data = generate_report(students)
-    write_summary(report_data, output_file)
-
-    print(f"Report generated successfully in '{output_file}'.")
+    report_data = engine.reports() if top_k is None else engine.top_k(top_k)
+    if shard_size:
+        files = write_sharded(report_data, "report_{shard}.txt", shard_by_id(shard_size), workers)
+        print(f"Report generated successfully in {len(files)} file(s): {', '.join(files)}.")
+    else:
+        write_summary(report_data, output_file, workers)
+        print(f"Report generated successfully in '{output_file}'.")
+    if jsonl_file:
+        write_jsonl(report_data, jsonl_file)
+        print(f"JSON Lines written to '{jsonl_file}'.")
+    if csv_file:
+        write_csv(report_data, csv_file)
+        print(f"CSV written to '{csv_file}'.")
 
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate report cards from Student_Data.txt.")
+    parser.add_argument("--top", type=int, help="only the K best students")
+    parser.add_argument("--workers", type=int, help="render in this many processes")
+    parser.add_argument("--shard-size", type=int, help="one report file per range of student IDs")
+    parser.add_argument("--jsonl", help="also write JSON Lines to this file")
+    parser.add_argument("--csv", help="also write CSV to this file")
+    args = parser.parse_args()
+    main(args.top, args.workers, args.shard_size, args.jsonl, args.csv)
@@ -1,85 +1,123 @@
 
 
-import json
 import os
-import time
 from datetime import datetime, date
 import calendar
+import math
 from functools import wraps
 
+from Expense_Dates import sort_by_day
+from Expense_Journal import (LedgerConflict, append_record, ledger_lock, ledger_version, load_cached,
+                             load_versioned, write_snapshot)
+from Expense_Rollup import add_to_rollup, load_rollup, month_summary
+import Expense_db
+from Expense_Records import from_paise, paise_or_none
+from Log_Writer import log_line
+from Perf_Metrics import format_phases, instrument, phase, timed_input
+from Profiler import profiled
+
 EXPENSES_FILE = "expenses.json"
 LOG_FILE = "app_log.txt"
+EXPENSES_DB = "expenses.db"
+# "json" (expenses.json + journal) or "sqlite" (expenses.db)
+EXPENSE_BACKEND = os.environ.get("EXPENSE_BACKEND", "json")
+
+# Ledger version seen by the last load_expenses(), so save_expenses() does
+# not overwrite expenses appended since then.
+_loaded_version = None
 
 
 def ensure_files():
-    if not os.path.exists(EXPENSES_FILE):
-        with open(EXPENSES_FILE, "w", encoding="utf-8") as f:
-            json.dump([], f, ensure_ascii=False, indent=2)
-    else:
-        try:
-            with open(EXPENSES_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if not isinstance(data, list):
-                raise ValueError("expenses.json root is not a list")
-        except (json.JSONDecodeError, ValueError):
-            backup = EXPENSES_FILE + ".bak"
-            try:
-                os.replace(EXPENSES_FILE, backup)
-                print(f"[Warning] Corrupted {EXPENSES_FILE} moved to {backup}. Created a new empty {EXPENSES_FILE}.")
-            except Exception:
-                print(f"[Warning] Could not create backup of corrupted {EXPENSES_FILE}. Overwriting.")
-            with open(EXPENSES_FILE, "w", encoding="utf-8") as f:
-                json.dump([], f, ensure_ascii=False, indent=2)
+    if EXPENSE_BACKEND == "sqlite":
+        Expense_db.open_ledger(EXPENSES_DB)
+        return
+    # Loading replays the journal and recovers a damaged snapshot up to the
+    # last valid record.
+    load_cached(EXPENSES_FILE)
 
 
 def log_message(text: str):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a", encoding="utf-8") as f:
-        f.write(f"{timestamp} {text}\n")
+    log_line(LOG_FILE, f"{timestamp} {text}\n")
 
 
 def log_and_time(func):
+    def report(duration, error, phases):
+        text = f"Function '{func.__name__}' executed in {duration:.4f}s ({format_phases(phases)})"
+        log_message(text)
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {text}")
+
+    timed = instrument(func, on_done=report)
+
     @wraps(func)
     def wrapper(*args, **kwargs):
         start_dt = datetime.now()
-        start_ts = time.perf_counter()
         print(f"[{start_dt.strftime('%Y-%m-%d %H:%M:%S')}] Starting '{func.__name__}'...")
-        result = None
-        try:
-            result = func(*args, **kwargs)
-            return result
-        finally:
-            end_ts = time.perf_counter()
-            duration = end_ts - start_ts
-            log_line = f"Function '{func.__name__}' executed in {duration:.4f}s"
-            log_message(log_line)
-            print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {log_line}")
+        return timed(*args, **kwargs)
     return wrapper
 
 
 def load_expenses():
-    ensure_files()
-    with open(EXPENSES_FILE, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-            if not isinstance(data, list):
-                return []
-            return data
-        except json.JSONDecodeError:
-            return []
+    global _loaded_version
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.fetch_expenses(Expense_db.open_ledger(EXPENSES_DB))
+        records, _loaded_version = load_versioned(EXPENSES_FILE)
+        return records
 
 
 def save_expenses(expenses):
-    with open(EXPENSES_FILE, "w", encoding="utf-8") as f:
-        json.dump(expenses, f, ensure_ascii=False, indent=2)
+    global _loaded_version
+    with phase("save"):
+        if EXPENSE_BACKEND == "sqlite":
+            Expense_db.replace_all(Expense_db.open_ledger(EXPENSES_DB), expenses)
+            return True
+        with ledger_lock(EXPENSES_FILE):
+            try:
+                write_snapshot(EXPENSES_FILE, expenses, expected_version=_loaded_version)
+            except LedgerConflict:
+                print("[Warning] Expenses were added since they were loaded. Load them again before saving.")
+                return False
+            _loaded_version = ledger_version(EXPENSES_FILE)
+        return True
+
+
+def append_expense(entry):
+    with phase("save"):
+        if EXPENSE_BACKEND == "sqlite":
+            Expense_db.insert_expense(Expense_db.open_ledger(EXPENSES_DB), entry)
+            return
+        with ledger_lock(EXPENSES_FILE):
+            append_record(EXPENSES_FILE, entry)
+            add_to_rollup(EXPENSES_FILE)
+
+
+def expense_count():
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.count_expenses(Expense_db.open_ledger(EXPENSES_DB))
+        return load_rollup(EXPENSES_FILE)["records"]
+
+
+def summarize_month(year, month):
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.month_summary(Expense_db.open_ledger(EXPENSES_DB), year, month)
+        return month_summary(load_rollup(EXPENSES_FILE), year, month)
+
+
+def quarantined_count():
+    # Expenses with an invalid date, which no monthly summary includes.
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.count_undated(Expense_db.open_ledger(EXPENSES_DB))
+        return load_rollup(EXPENSES_FILE)["quarantined"]
 
 
 @log_and_time
 def add_expense():
-    expenses = load_expenses()
-
     while True:
-        raw_date = input("Enter date (YYYY-MM-DD) or press Enter for today: ").strip()
+        raw_date = timed_input("Enter date (YYYY-MM-DD) or press Enter for today: ").strip()
         if raw_date == "":
             expense_date = date.today().strftime("%Y-%m-%d")
             break
@@ -91,14 +129,16 @@ def add_expense():
             except ValueError:
                 print("Invalid date format. Please use YYYY-MM-DD (e.g., 2025-11-04).")
 
-    category = input("Enter category (e.g., Food, Travel, Shopping, Bills): ").strip()
+    category = timed_input("Enter category (e.g., Food, Travel, Shopping, Bills): ").strip()
     if category == "":
         category = "Misc"
 
     while True:
-        amt_str = input("Enter amount: ").strip()
+        amt_str = timed_input("Enter amount: ").strip()
         try:
             amount = float(amt_str)
+            if not math.isfinite(amount):
+                raise ValueError(amt_str)
             if amount < 0:
                 print("Amount cannot be negative. Please enter a positive number.")
                 continue
@@ -106,7 +146,7 @@ def add_expense():
         except ValueError:
             print("Invalid amount. Please enter a numeric value (e.g., 350 or 350.50).")
 
-    description = input("Enter description (optional): ").strip()
+    description = timed_input("Enter description (optional): ").strip()
 
     entry = {
         "date": expense_date,
@@ -115,8 +155,7 @@ def add_expense():
         "description": description,
     }
 
-    expenses.append(entry)
-    save_expenses(expenses)
+    append_expense(entry)
     print("✅ Expense added successfully!")
 
 
@@ -127,40 +166,47 @@ def view_expenses():
         print("No expenses recorded yet.")
         return
 
-    def parse_date(e):
-        try:
-            return datetime.strptime(e.get("date", ""), "%Y-%m-%d")
-        except Exception:
-            return datetime.min
-
-    expenses_sorted = sorted(expenses, key=parse_date)
-
-    print("-" * 72)
-    print(f"{'Date':<12} | {'Category':<15} | {'Amount':>10} | Description")
-    print("-" * 72)
-    total = 0.0
-    for e in expenses_sorted:
-        d = e.get("date", "")
-        c = e.get("category", "")
-        a = e.get("amount", 0.0)
-        desc = e.get("description", "")
-        total += float(a or 0.0)
-        print(f"{d:<12} | {c:<15} | {a:10.2f} | {desc}")
-    print("-" * 72)
-    print(f"{'Total':<12} | {'':<15} | {total:10.2f}")
-    print("-" * 72)
+    if EXPENSE_BACKEND == "sqlite":
+        expenses_sorted, quarantined = expenses, []  # already in date order from the index
+    else:
+        expenses_sorted, quarantined = sort_by_day(expenses)
+
+    with phase("render"):
+        print("-" * 72)
+        print(f"{'Date':<12} | {'Category':<15} | {'Amount':>10} | Description")
+        print("-" * 72)
+        total_paise = 0
+        bad_amounts = 0
+        for e in expenses_sorted:
+            d = e.get("date", "")
+            c = e.get("category", "")
+            a = e.get("amount", 0.0)
+            desc = e.get("description", "")
+            paise = paise_or_none(a or 0.0)
+            if paise is None:
+                bad_amounts += 1
+            else:
+                total_paise += paise
+            print(f"{d:<12} | {c:<15} | {a:10.2f} | {desc}")
+        print("-" * 72)
+        print(f"{'Total':<12} | {'':<15} | {from_paise(total_paise):10.2f}")
+        print("-" * 72)
+        if bad_amounts:
+            print(f"⚠️ {bad_amounts} expense(s) left out of the total because of an invalid amount.")
+        if quarantined:
+            print(f"⚠️ {len(quarantined)} expense(s) skipped because of an invalid date:")
+            for e in quarantined:
+                print(f"   {e.get('date', '')!r} | {e.get('category', '')} | {e.get('amount', '')} | {e.get('description', '')}")
 
 
 @log_and_time
 def generate_monthly_summary(export=False):
-    
-    expenses = load_expenses()
-    if not expenses:
+    if not expense_count():
         print("No expenses recorded yet.")
         return
 
     while True:
-        raw = input("Enter month and year (MM YYYY) e.g., 11 2025: ").strip()
+        raw = timed_input("Enter month and year (MM YYYY) e.g., 11 2025: ").strip()
         parts = raw.split()
         if len(parts) != 2:
             print("Please enter month and year like: MM YYYY (e.g., 11 2025)")
@@ -177,30 +223,24 @@ def generate_monthly_summary(export=False):
 
     month_name = calendar.month_name[mm]
 
-    summary_by_category = {}
-    month_total = 0.0
-    for e in expenses:
-        try:
-            e_date = datetime.strptime(e.get("date", ""), "%Y-%m-%d")
-        except Exception:
-            continue
-        if e_date.month == mm and e_date.year == yyyy:
-            cat = e.get("category", "Misc")
-            amt = float(e.get("amount", 0.0))
-            summary_by_category[cat] = summary_by_category.get(cat, 0.0) + amt
-            month_total += amt
-
-    print()
-    header = f" Monthly Summary: {month_name} {yyyy} "
-    print(header)
-    if not summary_by_category:
-        print("No expenses found for this month.")
-    else:
-        for cat, amt in summary_by_category.items():
-            print(f"{cat}: ₹{amt:.2f}")
-        print("-" * 41)
-        print(f"Total: ₹{month_total:.2f}")
+    summary_by_category, month_total = summarize_month(yyyy, mm)
 
+    with phase("render"):
+        print()
+        header = f" Monthly Summary: {month_name} {yyyy} "
+        print(header)
+        if not summary_by_category:
+            print("No expenses found for this month.")
+        else:
+            for cat, amt in summary_by_category.items():
+                print(f"{cat}: ₹{amt:.2f}")
+            print("-" * 41)
+            print(f"Total: ₹{month_total:.2f}")
+        quarantined = quarantined_count()
+        if quarantined:
+            print(f"⚠️ {quarantined} expense(s) with an invalid date are not in any month.")
+
+@profiled("smart_expense_tracker")
 def main_menu():
     ensure_files()
     menu = """
@@ -1,28 +1,199 @@
 # cook your dish here
+import codecs
+import os
+import re
+import sys
+from bisect import bisect_left, insort
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+# Words are runs of a-z after lowercasing; whitespace separates words and
+# every other character is dropped, so "Don't" counts as "dont".
+#
+#   counts = count_file("book.txt")              # streamed in CHUNK_SIZE pieces
+#   counts = count_file("big.txt", workers=4)    # sharded by byte range
+#   exactly(counts, 3), top_k(counts, 10)
+#
+# For many queries over the same text, build a Corpus once instead.
+
+CHUNK_SIZE = 1 << 20
+_DROP = re.compile(r"[^a-z\s]+")
+_SPACE_BYTES = b" \t\n\r\x0b\x0c"
+
+
+def clean_text(text):
+    return _DROP.sub("", text.lower())
+
+
+def count_words(text, counts=None):
+    counts = Counter() if counts is None else counts
+    counts.update(clean_text(text).split())
+    return counts
+
+
+def _count_chunks(chunks, counts=None):
+    # A word cut at the end of one chunk is carried over to the next.
+    counts = Counter() if counts is None else counts
+    carry = ""
+    for chunk in chunks:
+        text = carry + clean_text(chunk)
+        words = text.split()
+        if words and not text[-1].isspace():
+            carry = words.pop()
+        else:
+            carry = ""
+        counts.update(words)
+    if carry:
+        counts[carry] += 1
+    return counts
+
+
+def count_stream(stream, chunk_size=CHUNK_SIZE, counts=None):
+    return _count_chunks(iter(lambda: stream.read(chunk_size), ""), counts)
+
+
+def _next_space(f, pos):
+    # Position of the first whitespace byte at or after pos (or end of file).
+    f.seek(pos)
+    while True:
+        block = f.read(4096)
+        if not block:
+            return f.tell()
+        for i, byte in enumerate(block):
+            if byte in _SPACE_BYTES:
+                return pos + i
+        pos += len(block)
+
+
+def shard_ranges(path, shards):
+    # Splits the file into byte ranges that start and end on whitespace,
+    # so no word (or UTF-8 character) straddles two shards.
+    size = os.path.getsize(path)
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, shards):
+            bounds.append(max(bounds[-1], _next_space(f, size * i // shards)))
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+
+def _read_range(path, start, end, chunk_size):
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield decoder.decode(data)
+    yield decoder.decode(b"", final=True)
 
-def word_count(sentence, N):
-    sentence = sentence.lower()
-
-    lst = list(sentence)
-    new_list = []
-    for item in lst:
-        if(item == " " or ( 97 <= ord(item) <= 122)):
-            new_list.append(item)
-            
-    new_list = "".join(new_list)
-    print(new_list)
-    words = new_list.split()
 
-    freq = {}
+def count_range(path, start, end, chunk_size=CHUNK_SIZE):
+    return _count_chunks(_read_range(path, start, end, chunk_size))
 
-    for word in words:
-        freq[word] = freq.get(word, 0) + 1
 
-    result = [(word, count) 
-              for word, count in freq.items() 
-              if count == N]
+def count_file(path, chunk_size=CHUNK_SIZE, workers=None):
+    if workers and workers > 1 and os.path.getsize(path) > chunk_size:
+        ranges = shard_ranges(path, workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            starts, ends = zip(*ranges)
+            parts = pool.map(count_range, repeat(path), starts, ends, repeat(chunk_size))
+            counts = Counter()
+            for part in parts:  # in file order, so first-seen order is kept
+                counts.update(part)
+        return counts
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return count_stream(f, chunk_size)
+
+
+def exactly(counts, N):
+    return [(word, count) for word, count in counts.items() if count == N]
+
+
+def top_k(counts, K):
+    return counts.most_common(K)
+
+
+class Corpus:
+    # Word counts plus an index from each count to the words that have it,
+    # so repeated queries do not rescan the whole table.
+    #
+    #   corpus = Corpus(text)
+    #   corpus.exactly(3), corpus.at_least(2), corpus.top_k(10)
+    #   corpus.add_text(more_text)
+    def __init__(self, text=None):
+        self.counts = Counter()
+        self._by_count = {}    # count -> {word: None}, insertion ordered
+        self._levels = []      # distinct counts, ascending
+        if text:
+            self.add_text(text)
+
+    def __len__(self):
+        return len(self.counts)
+
+    def _move(self, word, old, new):
+        if old:
+            bucket = self._by_count[old]
+            del bucket[word]
+            if not bucket:
+                del self._by_count[old]
+                del self._levels[bisect_left(self._levels, old)]
+        bucket = self._by_count.get(new)
+        if bucket is None:
+            bucket = self._by_count[new] = {}
+            insort(self._levels, new)
+        bucket[word] = None
+
+    def add_counts(self, counts):
+        for word, n in counts.items():
+            old = self.counts[word]
+            self.counts[word] = old + n
+            self._move(word, old, old + n)
+        return self
+
+    def add_text(self, text):
+        return self.add_counts(count_words(text))
+
+    def add_file(self, path, chunk_size=CHUNK_SIZE, workers=None):
+        return self.add_counts(count_file(path, chunk_size, workers))
+
+    def exactly(self, N):
+        return [(word, N) for word in self._by_count.get(N, ())]
+
+    def at_least(self, N):
+        # Most frequent first.
+        result = []
+        for i in range(len(self._levels) - 1, bisect_left(self._levels, N) - 1, -1):
+            count = self._levels[i]
+            result.extend((word, count) for word in self._by_count[count])
+        return result
+
+    def top_k(self, K):
+        result = []
+        for count in reversed(self._levels):
+            for word in self._by_count[count]:
+                if len(result) >= K:
+                    return result
+                result.append((word, count))
+        return result
+
+
+def word_count(sentence, N):
+    new_list = clean_text(sentence)
+    print(new_list)
+    return exactly(Counter(new_list.split()), N)
 
-    return result
 
-text = "Apple is apple and the apple is not mango and mango is mango"
-print(word_count(text,3))
\ No newline at end of file
+if __name__ == "__main__":
+    # python Word_Counter.py [file N [workers]]
+    if len(sys.argv) > 2:
+        counts = count_file(sys.argv[1], workers=int(sys.argv[3]) if len(sys.argv) > 3 else None)
+        print(exactly(counts, int(sys.argv[2])))
+        print(top_k(counts, 10))
+    else:
+        text = "Apple is apple and the apple is not mango and mango is mango"
+        print(word_count(text,3))
@@ -1,75 +1,130 @@
 import json
 import os
-import time
 from datetime import datetime
 import calendar
+import math
+
+from Expense_Dates import sort_by_day
+from Expense_Journal import (LedgerConflict, append_record, ledger_lock, ledger_version, load_versioned,
+                             write_snapshot)
+from Expense_Rollup import add_to_rollup, load_rollup, month_summary
+import Expense_db
+from Expense_Records import from_paise, paise_or_none
+from Log_Writer import log_line
+from Perf_Metrics import format_phases, instrument, phase, timed_input
+from Profiler import profiled
 
 EXPENSES_FILE = "expenses.json"
 LOG_FILE = "app_log.txt"
+EXPENSES_DB = "expenses.db"
+# "json" (expenses.json + journal) or "sqlite" (expenses.db)
+EXPENSE_BACKEND = os.environ.get("EXPENSE_BACKEND", "json")
+
+# Ledger version seen by the last load_expenses(), so save_expenses() does
+# not overwrite expenses appended since then.
+_loaded_version = None
 
 def log_performance(func):
+    def report(duration, error, phases):
+        Log_Message(f"Function '{func.__name__}' executed in {duration:.4f}s ({format_phases(phases)})")
+        print(f" {func.__name__} executed in {duration:.4f} seconds ({format_phases(phases)})\n")
+
+    timed = instrument(func, on_done=report)
+
     def wrapper(*args, **kwargs):
-        start = time.time()
         print(f"\n Running {func.__name__}...")
-        result = func(*args, **kwargs)
-        end = time.time()
-        duration = end - start
-        log_line = f"Function '{func.__name__}' executed in {duration:.4f}s"
-        Log_Message(log_line)
-        print(f" {func.__name__} executed in {duration:.4f} seconds\n")
-        return result
+        return timed(*args, **kwargs)
     return wrapper
 
 
 def Log_Message(text: str):
     TimeStamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a") as f:
-        f.write(f"{TimeStamp} {text}\n")
+    log_line(LOG_FILE, f"{TimeStamp} {text}\n")
 
 
 
 def load_expenses():
-    if not os.path.exists(EXPENSES_FILE):
-        with open(EXPENSES_FILE, "w") as f:
-            json.dump([], f, ensure_ascii=False, indent=2)
-    try:
-        with open(EXPENSES_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, ValueError):
-        backup = EXPENSES_FILE + ".bak"
-        os.replace(EXPENSES_FILE, backup)
-        print(f"[Warning] Corrupted {EXPENSES_FILE} moved to {backup}. Created a new one.")
-        
+    global _loaded_version
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.fetch_expenses(Expense_db.open_ledger(EXPENSES_DB))
+        records, _loaded_version = load_versioned(EXPENSES_FILE)
+        return records
+
 
 def save_expenses(data):
-    with open(EXPENSES_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    global _loaded_version
+    with phase("save"):
+        if EXPENSE_BACKEND == "sqlite":
+            Expense_db.replace_all(Expense_db.open_ledger(EXPENSES_DB), data)
+            return True
+        with ledger_lock(EXPENSES_FILE):
+            try:
+                write_snapshot(EXPENSES_FILE, data, expected_version=_loaded_version)
+            except LedgerConflict:
+                print("[Warning] Expenses were added since they were loaded. Load them again before saving.")
+                return False
+            _loaded_version = ledger_version(EXPENSES_FILE)
+        return True
+
+
+def append_expense(record):
+    with phase("save"):
+        if EXPENSE_BACKEND == "sqlite":
+            Expense_db.insert_expense(Expense_db.open_ledger(EXPENSES_DB), record)
+            return
+        with ledger_lock(EXPENSES_FILE):
+            append_record(EXPENSES_FILE, record)
+            add_to_rollup(EXPENSES_FILE)
+
+
+def expense_count():
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.count_expenses(Expense_db.open_ledger(EXPENSES_DB))
+        return load_rollup(EXPENSES_FILE)["records"]
+
+
+def summarize_month(year, month):
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.month_summary(Expense_db.open_ledger(EXPENSES_DB), year, month)
+        return month_summary(load_rollup(EXPENSES_FILE), year, month)
+
+
+def quarantined_count():
+    # Expenses with an invalid date, which no monthly summary includes.
+    with phase("load"):
+        if EXPENSE_BACKEND == "sqlite":
+            return Expense_db.count_undated(Expense_db.open_ledger(EXPENSES_DB))
+        return load_rollup(EXPENSES_FILE)["quarantined"]
 
 
 @log_performance
 def add_expense():
-    date_input = input("Enter date (YYYY-MM-DD) [default: today]: ").strip()
+    date_input = timed_input("Enter date (YYYY-MM-DD) [default: today]: ").strip()
     if not date_input:
         date_str = datetime.today().strftime("%Y-%m-%d")
     else:
         try:
-            datetime.strptime(date_input, "%Y-%m-%d")
-            date_str = date_input
+            date_str = datetime.strptime(date_input, "%Y-%m-%d").date().isoformat()
         except ValueError:
             print(" Invalid date format. Use YYYY-MM-DD.")
             
 
-    category = input("Enter category (e.g., Food, Travel, Shopping, Bills): ").strip()
+    category = timed_input("Enter category (e.g., Food, Travel, Shopping, Bills): ").strip()
     if category == "":
         category = "Default"
-    amt_str = input("Enter amount:").strip()
+    amt_str = timed_input("Enter amount:").strip()
     try:
         amount = float(amt_str)
+        if not math.isfinite(amount):
+            raise ValueError(amt_str)
     except ValueError:
         print(" Invalid amount.")
         return
 
-    description = input("Enter description : ").strip() or ""
+    description = timed_input("Enter description : ").strip() or ""
 
     record = {
         "date": date_str,
@@ -78,9 +133,7 @@ def add_expense():
         "description": description or ""
     }
 
-    data = load_expenses()
-    data.append(record)
-    save_expenses(data)
+    append_expense(record)
     print("-"*41)
     print(" Expense added successfully!\n")
 
@@ -91,41 +144,50 @@ def view_all_expenses():
     if not data:
         print("No expenses recorded yet.")
         return
-    try:
-        data.sort(key=lambda x: datetime.strptime(x["date"], "%Y-%m-%d"))
-    except Exception as e:
-        print(f"Error sorting data: {e}")
-        return
-
-    print("\n--- All Expenses (Sorted by Date) ---")
-    print(f"{'S.No':<5} {'Date':<12} {'Category':<15} {'Amount (₹)':>12} {'Description'}")
-    print("-" * 65)
-
-    total = 0.0
-    for i, exp in enumerate(data, 1):
-        date = exp.get("date", "")
-        category = exp.get("category", "Misc")
-        amount = float(exp.get("amount", 0.0))
-        description = exp.get("description", "")
-        total += amount
-
-        # Formatted row
-        print(f"{i:<5} {date:<12} {category:<15} {amount:>12.2f} {description}")
-
-    print("-" * 65)
-    print(f"{'Total Expenditure:':<34} ₹{total:.2f}")
-    print(f"Total Records: {len(data)}")
+    quarantined = []
+    if EXPENSE_BACKEND != "sqlite":  # the SQLite backend returns rows in date order
+        data, quarantined = sort_by_day(data)
+
+    with phase("render"):
+        print("\n--- All Expenses (Sorted by Date) ---")
+        print(f"{'S.No':<5} {'Date':<12} {'Category':<15} {'Amount (₹)':>12} {'Description'}")
+        print("-" * 65)
+
+        total_paise = 0
+        bad_amounts = 0
+        for i, exp in enumerate(data, 1):
+            date = exp.get("date", "")
+            category = exp.get("category", "Misc")
+            amount = float(exp.get("amount", 0.0))
+            description = exp.get("description", "")
+            paise = paise_or_none(amount)
+            if paise is None:
+                bad_amounts += 1
+            else:
+                total_paise += paise
+
+            # Formatted row
+            print(f"{i:<5} {date:<12} {category:<15} {amount:>12.2f} {description}")
+
+        print("-" * 65)
+        print(f"{'Total Expenditure:':<34} ₹{from_paise(total_paise):.2f}")
+        if bad_amounts:
+            print(f"{bad_amounts} expense(s) left out of the total because of an invalid amount.")
+        if quarantined:
+            print(f"\n{len(quarantined)} expense(s) not shown because of an invalid date:")
+            for exp in quarantined:
+                print(f"  {exp.get('date', '')!r} {exp.get('category', '')} {exp.get('amount', '')} {exp.get('description', '')}")
+        print(f"Total Records: {len(data)}")
 
 
 @log_performance
 def generate_monthly_summary():
-    data = load_expenses()
-    if not data:
+    if not expense_count():
         print("No expenses recorded yet.")
         return
     while True:
-        summary_month =int(input("Enter the Month : "))
-        summary_year  = int(input("Enter the Year (in yyyy formate): "))
+        summary_month =int(timed_input("Enter the Month : "))
+        summary_year  = int(timed_input("Enter the Year (in yyyy formate): "))
         try:
             if not (1 <= summary_month <= 12):
                 raise ValueError
@@ -135,34 +197,27 @@ def generate_monthly_summary():
 
     month_name = calendar.month_name[summary_month]
 
-    summary_by_category = {}
-    month_total = 0.0
-    for e in data:
-        try:
-            e_date = datetime.strptime(e.get("date", ""), "%Y-%m-%d")
-        except Exception:
-            continue
-        if e_date.month == summary_month and e_date.year == summary_year:
-            cat = e.get("category", "Misc")
-            amt = float(e.get("amount", 0.0))
-            summary_by_category[cat] = summary_by_category.get(cat, 0.0) + amt
-            month_total += amt
-
-
-    print("\n--- Monthly Summary ---")
-    if not summary_by_category:
-            print("No expenses found for this month.")
-    else:
-            for cat, amt in summary_by_category.items():
-                print(f"{cat}: ₹{amt:.2f}")
-            print("-" * 41)
-            print(f"Total: ₹{month_total:.2f}")
+    summary_by_category, month_total = summarize_month(summary_year, summary_month)
+
+
+    with phase("render"):
+        print("\n--- Monthly Summary ---")
+        if not summary_by_category:
+                print("No expenses found for this month.")
+        else:
+                for cat, amt in summary_by_category.items():
+                    print(f"{cat}: ₹{amt:.2f}")
+                print("-" * 41)
+                print(f"Total: ₹{month_total:.2f}")
+        quarantined = quarantined_count()
+        if quarantined:
+            print(f"{quarantined} expense(s) with an invalid date are not in any month.")
     
 
-    save_summary = input("Do you want to save this summary as JSON? (y/n): ").strip().lower()
+    save_summary = timed_input("Do you want to save this summary as JSON? (y/n): ").strip().lower()
     if save_summary == "y":
         filename = f"summary_{summary_year}_{summary_month}.json"
-        with open(filename, "w") as file:
+        with phase("save"), open(filename, "w") as file:
             json.dump({
                 "month": summary_month,
                 "year": summary_year,
@@ -173,6 +228,7 @@ def generate_monthly_summary():
         print("-"*30)
 
 
+@profiled("smart_expense")
 def main():
     print("\n ---------SMART EXPENSE TRACKER---------- ")
     while True: